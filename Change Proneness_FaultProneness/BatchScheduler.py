@@ -0,0 +1,118 @@
+import os
+import signal
+import sys
+import time
+import multiprocessing
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+try:
+    import resource
+except ImportError:  # Windows has no rlimits, memory caps are then ignored
+    resource = None
+
+# Exit code a project reports when it runs out of its memory cap
+MEMORY_EXIT_CODE = 75
+
+# One project to run, with the callable and arguments that analyze it
+class ProjectJob(NamedTuple):
+    name: str
+    path: str
+    target: Callable
+    args: tuple
+
+def estimate_repository_size(project_path: str) -> int:
+    """
+    Bytes stored under .git/objects, a cheap proxy for how long a history takes to walk.
+    """
+    total = 0
+    for root, _, files in os.walk(os.path.join(project_path, '.git', 'objects')):
+        for file in files:
+            try:
+                total += os.path.getsize(os.path.join(root, file))
+            except OSError:
+                continue
+    return total
+
+def run_job(target: Callable, args: tuple, memory_limit_mb: Optional[int]):
+    """
+    Entry point of a project process: apply the memory cap, then run the analysis.
+    """
+    # Own process group, so a timeout also kills the git processes started by the analysis
+    if hasattr(os, 'setsid'):
+        os.setsid()
+    if memory_limit_mb and resource is not None:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    try:
+        target(*args)
+    except MemoryError:
+        print(f"❌ Memory limit of {memory_limit_mb} MB exceeded")
+        sys.exit(MEMORY_EXIT_CODE)
+
+def kill_job(process: multiprocessing.Process):
+    try:
+        if hasattr(os, 'killpg'):
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+    process.join()
+
+def describe_exit(exitcode: int) -> str:
+    if exitcode == 0:
+        return 'ok'
+    if exitcode == MEMORY_EXIT_CODE:
+        return 'memory limit'
+    if exitcode < 0:
+        return f'killed by signal {-exitcode}'
+    return f'failed (exit code {exitcode})'
+
+def run_projects(jobs: List[ProjectJob], workers: Optional[int] = None, timeout: Optional[float] = None,
+                 memory_limit_mb: Optional[int] = None) -> Dict[str, str]:
+    """
+    Run project jobs concurrently, largest repository first, and return each project's status.
+    """
+    workers = workers or os.cpu_count() or 1
+    # Starting the longest jobs first keeps one big repository from finishing alone at the end
+    queue = sorted(jobs, key=lambda job: estimate_repository_size(job.path), reverse=True)
+    running = {}
+    statuses = {}
+    batch_start = time.perf_counter()
+
+    print(f"Scheduling {len(queue)} projects on {workers} workers"
+          + (f", timeout {timeout:.0f}s" if timeout else '')
+          + (f", memory cap {memory_limit_mb} MB" if memory_limit_mb else ''))
+
+    while queue or running:
+        while queue and len(running) < workers:
+            job = queue.pop(0)
+            process = multiprocessing.Process(target=run_job, args=(job.target, job.args, memory_limit_mb))
+            process.start()
+            running[job.name] = (process, time.perf_counter())
+            print(f"▶️  Started {job.name}")
+
+        time.sleep(0.2)
+
+        for name, (process, start) in list(running.items()):
+            elapsed = time.perf_counter() - start
+            if not process.is_alive():
+                process.join()
+                statuses[name] = describe_exit(process.exitcode)
+            elif timeout and elapsed > timeout:
+                kill_job(process)
+                statuses[name] = 'timeout'
+            else:
+                continue
+
+            del running[name]
+            print(f"{'✅' if statuses[name] == 'ok' else '❌'} {name}: {statuses[name]} after {elapsed:.1f}s")
+
+    failed = sorted(name for name, status in statuses.items() if status != 'ok')
+    print(f"\nBatch finished in {time.perf_counter() - batch_start:.1f}s: "
+          f"{len(statuses) - len(failed)} ok, {len(failed)} failed")
+    for name in failed:
+        print(f"  {name}: {statuses[name]}")
+
+    return statuses
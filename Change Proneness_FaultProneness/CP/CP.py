@@ -2,12 +2,20 @@
 
 # Python script (analyze_projects.py)
 import os
+import sys
+import argparse
 import pandas as pd
 
+from ChangeProneness import analyze_project
+
+# The project batch scheduler is shared with FP/ and lives in the parent folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from BatchScheduler import ProjectJob, run_projects
+
 # Path to the directory containing Python projects
 projects_path = ".../PynoseFullDatasetProjects"
 
-def analyze_projects():
+def analyze_projects(workers=None, timeout=None, memory_limit_mb=None):
     # Get absolute path for output directory
     current_dir = os.path.dirname(os.path.abspath(__file__))
     output_dir = os.path.join(current_dir, "123")
@@ -17,6 +25,10 @@ def analyze_projects():
         os.makedirs(output_dir)
         print(f"Created output directory: {output_dir}")
 
+    # Projects for the batch scheduler, used when concurrency or limits are requested
+    scheduled = workers or timeout or memory_limit_mb
+    jobs = []
+
     # Iterate through each project in the directory
     for project in os.listdir(projects_path):
         project_path = os.path.join(projects_path, project)
@@ -25,15 +37,30 @@ def analyze_projects():
         if not os.path.isdir(project_path):
             continue
             
-        print(f"Analyzing project: {project}")
-        
         # Generate CSV filename with absolute path
         csv_filename = f"{project}_analysis.csv"
         csv_path = os.path.join(output_dir, csv_filename)
+
+        if scheduled:
+            jobs.append(ProjectJob(project, project_path, analyze_project, (project, project_path, csv_path)))
+            continue
+
+        print(f"Analyzing project: {project}")
         
-        # Run the bash script for analysis
-        command = f"bash analyze_git_change_history.sh '{project}' '{project_path}' '{csv_path}'"
-        os.system(command)
+        # Single git history pass per project (replaces analyze_git_change_history.sh)
+        try:
+            analyze_project(project, project_path, csv_path)
+        except Exception as e:
+            print(f"Error analyzing {project}: {e}")
+
+    if scheduled:
+        run_projects(jobs, workers or 1, timeout, memory_limit_mb)
 
 if __name__ == "__main__":
-    analyze_projects()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Compute change proneness for every project')
+    parser.add_argument('--jobs', type=int, help='Analyze this many projects concurrently, largest repository first')
+    parser.add_argument('--timeout', type=float, help='Seconds after which a project is killed')
+    parser.add_argument('--memory_limit', type=int, help='Memory cap per project in MB')
+    args = parser.parse_args()
+
+    analyze_projects(args.jobs, args.timeout, args.memory_limit)
\ No newline at end of file
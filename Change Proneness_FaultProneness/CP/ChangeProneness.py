@@ -0,0 +1,221 @@
+import os
+import argparse
+import csv
+import subprocess
+import threading
+from typing import List, Dict, Iterator, Tuple
+
+# Single-pass replacement for analyze_git_change_history.sh.
+# For every tracked Python file it derives the same four metrics as the bash script:
+#   Changes      - commits touching the file, following renames (git log --follow; copies are not followed)
+#   TotalCommits - commits made after the file was created (git rev-list --count creation..HEAD)
+#   Insertions   - lines added between the creation commit and HEAD (git diff --stat creation..HEAD)
+#   Deletions    - lines removed between the creation commit and HEAD
+
+def iter_nul_tokens(command: List[str], stdin_lines: List[str] = None) -> Iterator[str]:
+    """
+    Run a git command with -z output and stream its NUL-separated tokens.
+    """
+    process = subprocess.Popen(
+        command, stdout=subprocess.PIPE,
+        stdin=subprocess.PIPE if stdin_lines is not None else None
+    )
+
+    # Feed stdin from a thread so neither pipe can fill up and block
+    writer = None
+    if stdin_lines is not None:
+        def write_lines():
+            try:
+                for line in stdin_lines:
+                    process.stdin.write(f'{line}\n'.encode())
+            finally:
+                process.stdin.close()
+
+        writer = threading.Thread(target=write_lines, daemon=True)
+        writer.start()
+
+    buffer = b''
+    try:
+        while True:
+            chunk = process.stdout.read(1 << 16)
+            if not chunk:
+                break
+            buffer += chunk
+            *tokens, buffer = buffer.split(b'\0')
+            for token in tokens:
+                yield token.decode('utf-8', errors='surrogateescape').lstrip('\n')
+    finally:
+        if writer is not None:
+            writer.join()
+        process.stdout.close()
+        if process.wait() != 0:
+            raise subprocess.CalledProcessError(process.returncode, command)
+
+def get_tracked_python_files(project_path: str) -> List[str]:
+    """
+    Tracked .py files that exist in the working tree, in git ls-files order.
+    """
+    command = ['git', '-C', project_path, 'ls-files', '-z', '--', '*.py']
+    return [
+        path for path in iter_nul_tokens(command)
+        if path and os.path.isfile(os.path.join(project_path, path))
+    ]
+
+def scan_change_history(project_path: str, files: List[str]) -> Tuple[Dict[str, int], Dict[str, Tuple[str, int]], bool]:
+    """
+    Walk the whole history once and return per-file change counts and creation commits.
+
+    Returns (changes, creations, has_merges) where creations maps a path to (creation sha, its position
+    in the log); without merges that position is the number of commits made after the file was created.
+    Positions of creation commits looked up separately are None.
+    """
+    command = [
+        'git', '-C', project_path,
+        'log', '-z', '--topo-order', '-M', '--name-status', '--format=%x01%H %P', 'HEAD'
+    ]
+
+    changes = {path: 0 for path in files}
+    # Historical name -> current file, updated as renames are walked backwards like git log --follow
+    aliases = {path: path for path in files}
+    creations = {}
+    adds = {}
+    has_merges = False
+
+    position = -1
+    sha = None
+    tokens = iter_nul_tokens(command)
+    for token in tokens:
+        if token.startswith('\x01'):
+            sha, *parents = token[1:].split()
+            has_merges = has_merges or len(parents) > 1
+            position += 1
+            continue
+        if not token:
+            continue
+
+        status = token[0]
+        if status in 'RC':
+            old_path, new_path = next(tokens), next(tokens)
+        else:
+            old_path = new_path = next(tokens)
+
+        # The log runs newest first, so the last add seen for a path is its creation
+        if status in 'AR' and new_path in changes:
+            creations[new_path] = (sha, position)
+            adds[new_path] = adds.get(new_path, 0) + 1
+
+        current = aliases.get(new_path)
+        if current is not None:
+            changes[current] += 1
+            if status == 'R':
+                # Older commits know this file by its previous name
+                del aliases[new_path]
+                aliases[old_path] = current
+
+    # With merges, a file added more than once (say on two branches) may have another oldest add in the
+    # date-ordered, simplified log the bash script reads; those few files are asked to git the same way
+    if has_merges:
+        for path, count in adds.items():
+            if count > 1:
+                creations[path] = (first_add_commit(project_path, path), None)
+
+    return changes, creations, has_merges
+
+def first_add_commit(project_path: str, path: str) -> str:
+    """Creation commit as the bash script finds it: git log --diff-filter=A --format=%H -- file | tail -1"""
+    output = subprocess.check_output(
+        ['git', '-C', project_path, 'log', '--diff-filter=A', '--format=%H', '--', path], universal_newlines=True
+    )
+    return output.split()[-1]
+
+def count_commits_since_creation(project_path: str, creations: Dict[str, Tuple[str, int]], has_merges: bool) -> Dict[str, int]:
+    """
+    Commits reachable from HEAD but not from each file's creation commit, git rev-list --count creation..HEAD.
+    In a linear history that is the creation commit's log position; merged branches can add commits
+    older than it in the log, so then each distinct creation commit is counted by git.
+    """
+    if not has_merges:
+        return {path: position for path, (_, position) in creations.items()}
+
+    counts = {}
+    for sha in sorted({sha for sha, _ in creations.values()}):
+        counts[sha] = int(subprocess.check_output(
+            ['git', '-C', project_path, 'rev-list', '--count', f'{sha}..HEAD'], universal_newlines=True
+        ))
+    return {path: counts[sha] for path, (sha, _) in creations.items()}
+
+def diff_since_creation(project_path: str, creations: Dict[str, Tuple[str, int]]) -> Dict[str, Tuple[int, int]]:
+    """
+    Insertions and deletions of each file between its creation commit and HEAD, from one git diff-tree process.
+    """
+    head = subprocess.check_output(['git', '-C', project_path, 'rev-parse', 'HEAD'], universal_newlines=True).strip()
+    creation_commits = sorted({sha for sha, _ in creations.values()})
+    wanted = {}
+    for path, (sha, _) in creations.items():
+        wanted.setdefault(sha, set()).add(path)
+
+    # diff-tree reads 'new old' lines; --always prints one header per line so answers stay in order
+    command = [
+        'git', '-C', project_path,
+        'diff-tree', '--stdin', '--always', '-z', '-r', '--numstat', '--no-renames', '--', '*.py'
+    ]
+    numstats = {}
+    index = -1
+    for token in iter_nul_tokens(command, [f'{head} {sha}' for sha in creation_commits]):
+        if not token:
+            continue
+        if '\t' not in token:
+            index += 1
+            continue
+
+        insertions, deletions, path = token.split('\t', 2)
+        if path in wanted[creation_commits[index]]:
+            numstats[path] = (
+                int(insertions) if insertions.isdigit() else 0,
+                int(deletions) if deletions.isdigit() else 0
+            )
+
+    return numstats
+
+def analyze_project(project_name: str, project_path: str, csv_file: str) -> int:
+    """
+    Compute change-proneness metrics for one project and write them to csv_file.
+    """
+    output_dir = os.path.dirname(csv_file)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    files = get_tracked_python_files(project_path)
+    changes, creations, has_merges = scan_change_history(project_path, files)
+    total_commits = count_commits_since_creation(project_path, creations, has_merges)
+    numstats = diff_since_creation(project_path, creations)
+
+    rows = 0
+    # The csv module quotes paths containing commas, quotes or newlines
+    with open(csv_file, 'w', newline='', encoding='utf-8', errors='surrogateescape') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(['Filename', 'Changes', 'TotalCommits', 'Insertions', 'Deletions'])
+
+        for path in files:
+            # Like the bash script, files without a creation commit are skipped
+            if path not in creations:
+                continue
+            insertions, deletions = numstats.get(path, (0, 0))
+            writer.writerow([path, changes[path], total_commits[path], insertions, deletions])
+            rows += 1
+
+    print(f"Analysis complete for {project_name}. {rows} files saved to {csv_file}")
+    return rows
+
+def main():
+    # Same arguments as analyze_git_change_history.sh
+    parser = argparse.ArgumentParser(description='Compute change-proneness metrics for one Git repository')
+    parser.add_argument('project_name', help='Project name used in log messages')
+    parser.add_argument('project_path', help='Path to the Git repository')
+    parser.add_argument('csv_file', help='Output CSV path')
+    args = parser.parse_args()
+
+    analyze_project(args.project_name, args.project_path, args.csv_file)
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,17 @@ import pandas as pd
 import os
 from pathlib import Path
 
+def normalize_paths(df):
+    """Write TestFile and File Path in one slash style, in place, so equal paths compare equal"""
+    df['TestFile'] = df['TestFile'].apply(lambda x: str(Path(x)).replace('\\', '/'))
+    df['File Path'] = df['File Path'].apply(lambda x: str(Path(x)).replace('\\', '/'))
+
+def keep_exact_matches(df):
+    """Rows whose TestFile and File Path are the same file, with both paths normalized"""
+    df = df.copy()
+    normalize_paths(df)
+    return df[df['TestFile'] == df['File Path']]
+
 def process_csv_files(input_folder, output_folder):
     """
     Process CSV files to keep only rows where TestFile and File Path match exactly.
@@ -33,8 +44,7 @@ def process_csv_files(input_folder, output_folder):
             original_columns = df.columns.tolist()
             
             # Convert paths to standard format for comparison
-            df['TestFile'] = df['TestFile'].apply(lambda x: str(Path(x)).replace('\\', '/'))
-            df['File Path'] = df['File Path'].apply(lambda x: str(Path(x)).replace('\\', '/'))
+            normalize_paths(df)
             
             # Keep only rows where paths match exactly
             df_filtered = df[df['TestFile'] == df['File Path']]
@@ -1,12 +1,39 @@
 import os
+import sys
 import pandas as pd
 
+# Path normalization and interning are shared with the other stages in the parent folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PathDictionary import MISSING_ID, PathDictionary, path_keys
+
 def extract_filename(path):
     """Safely extract filename."""
     if pd.isna(path):
         return None
     return os.path.basename(str(path))
 
+def merge_cp_with_smells(cp_df, smell_df):
+    """
+    Pair every CP row with the smell summary of its test file.
+    Both frames are copied before the join columns are added, so the inputs are left as they were.
+    """
+    cp_df = cp_df.copy()
+    smell_df = smell_df.copy()
+
+    # Extract filenames for test files
+    cp_df['test_filename'] = cp_df['TestFile'].apply(extract_filename)
+
+    # Join on the normalized repository-relative path, so test files sharing
+    # a name in different folders no longer match each other; the per-project
+    # dictionary turns the keys into int32 ids before the join hashes them
+    paths = PathDictionary()
+    cp_df['_path_key'] = paths.encode(path_keys(cp_df['TestFile']))
+    smell_df['_path_key'] = paths.encode(path_keys(smell_df['File Path']))
+    cp_df = cp_df[cp_df['_path_key'] != MISSING_ID]
+    smell_df = smell_df[smell_df['_path_key'] != MISSING_ID]
+
+    return cp_df.merge(smell_df, on='_path_key', how='inner').drop(columns='_path_key')
+
 def merge_project_csvs(cp_dir, smell_dir, output_dir):
     # Create output directory if not exists
     os.makedirs(output_dir, exist_ok=True)
@@ -38,14 +65,7 @@ def merge_project_csvs(cp_dir, smell_dir, output_dir):
                     # Read CSV files
                     cp_df = pd.read_csv(cp_file)
                     smell_df = pd.read_csv(smell_file)
-
-                    # Extract filenames for test files
-                    cp_df['test_filename'] = cp_df['TestFile'].apply(extract_filename)
-                    smell_df['test_filename'] = smell_df['File Path'].apply(extract_filename)
-
-                    # Merge on test filenames
-                    merged_df = cp_df.merge(smell_df, on='test_filename', how='inner')
-                    merged_df = merged_df.dropna(subset=['test_filename'])
+                    merged_df = merge_cp_with_smells(cp_df, smell_df)
 
                     # Save merged dataframe
                     merged_df.to_csv(output_file, index=False)
@@ -61,10 +81,11 @@ def merge_project_csvs(cp_dir, smell_dir, output_dir):
     log_df = pd.DataFrame(merge_log)
     log_df.to_csv(os.path.join(output_dir, 'merge_log.csv'), index=False)
 
-# Directories
-cp_dir = ".../CP/CP_Summary"
-smell_dir = "...TestSmells/SmellsCleanAggregatedData"
-output_dir = ".../SmellsPlusCPP"
+if __name__ == "__main__":
+    # Directories
+    cp_dir = ".../CP/CP_Summary"
+    smell_dir = "...TestSmells/SmellsCleanAggregatedData"
+    output_dir = ".../SmellsPlusCPP"
 
-# Merge files in bulk
-merge_project_csvs(cp_dir, smell_dir, output_dir)
\ No newline at end of file
+    # Merge files in bulk
+    merge_project_csvs(cp_dir, smell_dir, output_dir)
\ No newline at end of file
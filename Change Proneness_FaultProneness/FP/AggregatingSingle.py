@@ -1,7 +1,12 @@
-=
-
+import os
+import sys
 import pandas as pd
 
+# The test-file classifier is shared by every stage and lives in the parent folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from TestFileClassifier import classify_test_paths
+from SubstringMatcher import match_substrings
+
 def process_raw_data(file_path):
     """
     Process the space-separated file into a structured DataFrame.
@@ -31,8 +36,9 @@ def map_production_test_files(df):
     Maps production files with their associated test files.
     """
     # Separate test and production files
-    test_files = df[df['file_path'].str.contains('/test', case=False)]
-    prod_files = df[~df['file_path'].str.contains('/test', case=False)]
+    is_test = classify_test_paths(df['file_path'])
+    test_files = df[is_test]
+    prod_files = df[~is_test]
     
     # Create lists for mapped data
     production_files = []
@@ -40,25 +46,29 @@ def map_production_test_files(df):
     test_files_mapped = []
     test_faulty = []
     
+    # Base name of every production file, matched case-insensitively anywhere in the test paths
+    base_names = [prod_file.split('/')[-1].replace('.py', '').lower() for prod_file in prod_files['file_path']]
+    test_paths = test_files['file_path'].tolist()
+    test_status = test_files['is_faulty'].tolist()
+    
+    # One automaton pass over the test paths finds the matching tests of every base name
+    matches = match_substrings(base_names, (test_path.lower() for test_path in test_paths))
+    
     # For each production file, find matching test file
-    for _, prod_row in prod_files.iterrows():
-        prod_file = prod_row['file_path']
-        base_name = prod_file.split('/')[-1].replace('.py', '')
-        
-        # Look for matching test file
-        matching_tests = test_files[test_files['file_path'].str.contains(base_name, case=False)]
+    for prod_file, prod_faulty, base_name in zip(prod_files['file_path'], prod_files['is_faulty'], base_names):
+        matching_tests = matches.get(base_name, [])
         
-        if not matching_tests.empty:
+        if matching_tests:
             # Add all matching test files
-            for _, test_row in matching_tests.iterrows():
+            for position in matching_tests:
                 production_files.append(prod_file)
-                production_faulty.append(prod_row['is_faulty'])
-                test_files_mapped.append(test_row['file_path'])
-                test_faulty.append(test_row['is_faulty'])
+                production_faulty.append(prod_faulty)
+                test_files_mapped.append(test_paths[position])
+                test_faulty.append(test_status[position])
         else:
             # Add production file with no matching test
             production_files.append(prod_file)
-            production_faulty.append(prod_row['is_faulty'])
+            production_faulty.append(prod_faulty)
             test_files_mapped.append(None)
             test_faulty.append(None)
     
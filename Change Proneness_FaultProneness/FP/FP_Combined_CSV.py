@@ -1,5 +1,9 @@
-import pandas as pd
 import os
+import sys
+
+# The streaming CSV aggregator is shared by every stage and lives in the parent folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from StreamingAggregator import append_csv_files
 
 def find_result_csvs(root_dir):
     """Find all CSV files containing 'result' in their names in the given directory and its subdirectories"""
@@ -16,34 +20,19 @@ def find_result_csvs(root_dir):
 
 def combine_csv_files(file_paths, output_path):
     """Combine multiple CSV files into a single CSV file"""
-    # List to store all dataframes
-    dfs = []
+    # Each file is tagged with its project folder and streamed into the output
+    sources = [(file_path, os.path.basename(os.path.dirname(file_path))) for file_path in file_paths]
     
-    # Read each CSV file
-    for file_path in file_paths:
-        try:
-            df = pd.read_csv(file_path)
-            # Add a column for the source project
-            project_name = os.path.basename(os.path.dirname(file_path))
-            df['Project'] = project_name
-            dfs.append(df)
-            print(f"Successfully read: {file_path}")
-        except Exception as e:
-            print(f"Error reading {file_path}: {e}")
+    output_file = os.path.join(output_path, 'combined_results.csv')
+    files_combined, rows = append_csv_files(sources, output_file, source_column='Project')
     
-    if not dfs:
+    if not files_combined:
         print("No CSV files were successfully read!")
         return
     
-    # Combine all dataframes
-    combined_df = pd.concat(dfs, ignore_index=True)
-    
-    # Save the combined dataframe
-    output_file = os.path.join(output_path, 'combined_results.csv')
-    combined_df.to_csv(output_file, index=False)
     print(f"\nCombined CSV saved to: {output_file}")
-    print(f"Total number of rows: {len(combined_df)}")
-    print(f"Total number of files combined: {len(dfs)}")
+    print(f"Total number of rows: {rows}")
+    print(f"Total number of files combined: {files_combined}")
 
 def main():
     # Input and output paths
@@ -1,7 +1,42 @@
 import pandas as pd
 import os
+import re
 import glob
 
+# Production rows read, joined and written at a time, so memory stays bounded on large projects
+CHUNK_ROWS = 50_000
+
+# Test folders that may hold the tests of a production file in any folder
+GENERIC_TEST_DIRS = {'test', 'tests', 'unittest', 'unittests', 'unit', 'integration', 'spec', 'specs'}
+
+TEST_NAME_PATTERN = re.compile(r'^tests?_|_tests?(?=\.[^.]*$)', re.IGNORECASE)
+
+def add_join_keys(df, is_test):
+    """
+    Add the candidate-generator keys of every file: its base name without test affixes and its parent folder.
+    The row number is kept too, so joined pairs can be written in input order.
+    """
+    parts = df["File"].astype(str).str.replace('\\', '/', regex=False).str.rsplit('/', n=2)
+    base = parts.str[-1]
+    if is_test:
+        base = base.str.replace(TEST_NAME_PATTERN, '', regex=True)
+    parent = parts.map(lambda part: part[-2] if len(part) > 1 else '').str.lower()
+
+    df["_base"] = base.str.lower()
+    df["_parent"] = parent
+    df["_row"] = df.index
+    return df
+
+def join_candidates(df_prod, df_test):
+    """
+    Pair production rows with the plausible test rows: same base name, and the test lives either
+    in a generic test folder or in a folder named like the production file's folder.
+    """
+    mapped_df = df_prod.merge(df_test, on="_base", suffixes=("_Prod", "_Test"))
+    plausible = (mapped_df["_parent_Prod"] == mapped_df["_parent_Test"]) | mapped_df["_parent_Test"].isin(GENERIC_TEST_DIRS)
+    mapped_df = mapped_df[plausible].sort_values(["_row_Prod", "_row_Test"], kind="stable")
+    return mapped_df.drop(columns=["_base", "_parent_Prod", "_parent_Test", "_row_Prod", "_row_Test"])
+
 def create_mapped_csv(project_folder, output_folder):
     """Create a CSV mapping production files to test files for a given project folder."""
     project_name = os.path.basename(project_folder)
@@ -13,27 +48,29 @@ def create_mapped_csv(project_folder, output_folder):
         print(f"Skipping {project_name} (Missing CSV files).")
         return
 
-    # Load CSVs
-    df_prod = pd.read_csv(prod_file)
+    # Only the test side is held in memory, production rows are streamed
+    df_prod_header = pd.read_csv(prod_file, nrows=0)
     df_test = pd.read_csv(test_file)
 
-    if "File" not in df_prod.columns or "File" not in df_test.columns:
+    if "File" not in df_prod_header.columns or "File" not in df_test.columns:
         print(f"Skipping {project_name} (Missing 'File' column).")
         return
 
-    # Create mapping (Cartesian product)
-    df_prod["key"] = 1
-    df_test["key"] = 1
-    mapped_df = df_prod.merge(df_test, on="key", suffixes=("_Prod", "_Test")).drop(columns=["key"])
+    df_test = add_join_keys(df_test, is_test=True)
 
     # Output path
     os.makedirs(output_folder, exist_ok=True)
     output_file = os.path.join(output_folder, f"{project_name}_mapped.csv")
 
-    # Save to CSV
-    mapped_df.to_csv(output_file, index=False)
+    # Write the header once, then append each joined chunk
+    join_candidates(add_join_keys(df_prod_header, is_test=False), df_test.head(0)).to_csv(output_file, index=False)
+    pairs = 0
+    for df_prod in pd.read_csv(prod_file, chunksize=CHUNK_ROWS):
+        mapped_df = join_candidates(add_join_keys(df_prod, is_test=False), df_test)
+        mapped_df.to_csv(output_file, mode='a', header=False, index=False)
+        pairs += len(mapped_df)
 
-    print(f"Created mapped CSV for {project_name}: {output_file}")
+    print(f"Created mapped CSV for {project_name}: {output_file} ({pairs} candidate pairs)")
 
 def process_all_projects(input_folder, output_folder):
     """Iterate through all projects in the input folder and generate mapped CSVs."""
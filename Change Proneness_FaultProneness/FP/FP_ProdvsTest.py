@@ -1,18 +1,11 @@
 import pandas as pd
 import os
+import sys
 import glob
 
-def is_test_file(file_path: str) -> bool:
-    """Determine if a file is a test file based on common naming conventions."""
-    test_patterns = [
-        r"(^|/)tests?(/|$)",  # Matches folders named 'test' or 'tests'
-        r"(^|/)test_.*\.py$",  # Matches 'test_*.py'
-        r"(^|/).*_test\.py$",  # Matches '*_test.py'
-        r"(^|/)unittests?(/|$)",  # Matches 'unittest' or 'unittests' folders
-        r"(^|/)specs?(/|$)",  # Matches 'spec' or 'specs' folders
-    ]
-    
-    return any(pd.Series(file_path).str.contains(pattern, regex=True, na=False).iloc[0] for pattern in test_patterns)
+# The test-file classifier is shared by every stage and lives in the parent folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from TestFileClassifier import classify_test_paths
 
 def split_csv_by_file_type(input_file, output_folder):
     """Split a single CSV file into production and test files, and store them in a structured folder."""
@@ -23,7 +16,7 @@ def split_csv_by_file_type(input_file, output_folder):
         return
 
     # Apply test file detection logic
-    df["Is_Test"] = df["File"].apply(is_test_file)
+    df["Is_Test"] = classify_test_paths(df["File"])
     
     # Separate into production and test files
     prod_files = df[~df["Is_Test"]].drop(columns=["Is_Test", "Repository"])  # Drop "Repository"
@@ -1,17 +1,178 @@
 import os
 import git
 from pathlib import Path
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Iterator, Iterable, Optional, Set
 import argparse
 import csv
+import hashlib
+import json
 import re
 import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# The project batch scheduler, shared with CP/, and the memo cache live in the parent folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from BatchScheduler import ProjectJob, run_projects
+from MemoCache import MemoCache
+
+# Keywords that mark a commit as a bug fix; the rule version changes whenever they do
+BUG_KEYWORDS = frozenset({'bug', 'fix', 'defect', 'fault', 'issue', 'error'})
+BUG_RULES_VERSION = hashlib.sha1(','.join(sorted(BUG_KEYWORDS)).encode()).hexdigest()[:12]
+
+# Smaller histories are not worth splitting across processes
+MIN_COMMITS_PER_RANGE = 200
+
+# Answers (parent, child, path) numstat queries through one git process per repository
+class BatchedDiffBackend:
+    def __init__(self, repo_path: str, pathspecs: Iterable[str] = ()):
+        self.repo_path = Path(repo_path)
+        self.pathspecs = list(pathspecs)
+        self.pending = {}
+        self.results = {}
+
+    def request(self, parent: str, child: str, path: Optional[str] = None):
+        """
+        Queue a churn query for one path, or without a path for every path the pair changes;
+        it is answered by the next call to resolve().
+        """
+        if path is None:
+            self.pending[(parent, child)] = None
+        elif self.pending.get((parent, child), set()) is not None:
+            self.pending.setdefault((parent, child), set()).add(path.replace(os.sep, '/'))
+
+    def resolve(self):
+        """
+        Feed every queued commit pair to a single git diff-tree --stdin process and collect the numstats.
+        """
+        if not self.pending:
+            return
+
+        pairs = list(self.pending)
+        diff_command = [
+            'git', '-C', str(self.repo_path),
+            'diff-tree', '--stdin', '--always', '-z', '-r', '--numstat', '--no-renames',
+            '--', *self.pathspecs
+        ]
+        process = subprocess.Popen(diff_command, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+        # diff-tree reads 'child parent' lines; write them from a thread so neither pipe can fill up and block
+        def write_pairs():
+            try:
+                for parent, child in pairs:
+                    process.stdin.write(f'{child} {parent}\n'.encode())
+            finally:
+                process.stdin.close()
+
+        writer = threading.Thread(target=write_pairs, daemon=True)
+        writer.start()
+
+        # --always prints one header per input line, so headers map back to pairs in order
+        index = -1
+        wanted = set()
+        numstats = {}
+        buffer = b''
+        while True:
+            chunk = process.stdout.read(1 << 16)
+            if not chunk:
+                break
+            buffer += chunk
+            *tokens, buffer = buffer.split(b'\0')
+
+            for token in tokens:
+                token = token.decode('utf-8', errors='surrogateescape')
+                if '\t' not in token:
+                    if index >= 0:
+                        self.results[pairs[index]] = numstats
+                    index += 1
+                    wanted = self.pending[pairs[index]]
+                    numstats = {}
+                    continue
+
+                insertions, deletions, path = token.split('\t', 2)
+                # Binary files report '-' and count as no line changes
+                if wanted is None or path in wanted:
+                    numstats[path] = (
+                        int(insertions) if insertions.isdigit() else 0,
+                        int(deletions) if deletions.isdigit() else 0
+                    )
+
+        if index >= 0:
+            self.results[pairs[index]] = numstats
+
+        writer.join()
+        process.stdout.close()
+        if process.wait() != 0:
+            raise subprocess.CalledProcessError(process.returncode, diff_command)
+        self.pending.clear()
+
+    def numstat(self, parent: str, child: str, path: str) -> Tuple[int, int]:
+        """
+        Insertions and deletions of path between two resolved commits.
+        """
+        return self.results.get((parent, child), {}).get(path.replace(os.sep, '/'), (0, 0))
+
+    def changed_paths(self, parent: str, child: str) -> Set[str]:
+        """
+        Paths that differ between two commits, for a pair queued without a path.
+        """
+        return set(self.results.get((parent, child), {}))
+
+# SHA-keyed store of bug-fix classifications, persisted to SQLite when a path is given
+class CommitClassificationCache(MemoCache):
+    def __init__(self, db_path: Optional[str] = None, rules_version: str = BUG_RULES_VERSION):
+        super().__init__(db_path, rules_version, table='classifications')
+
+    def get(self, sha: str) -> Optional[bool]:
+        """
+        Cached classification of a commit, or None if unknown or classified under other rules.
+        """
+        is_bug_fix = super().get(sha)
+        return None if is_bug_fix is None else bool(is_bug_fix)
+
+def merge_history(older: Dict[str, Dict[str, int]], newer: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, int]]:
+    """
+    Combine the scan_history results of two adjacent commit ranges into one.
+    """
+    merged = {path: dict(stats) for path, stats in older.items()}
+
+    for path, stats in newer.items():
+        base = merged.get(path)
+        if base is None:
+            merged[path] = dict(stats)
+            continue
+
+        # The newer range's oldest commit is no longer the file's oldest, so it now counts in full
+        oldest = stats.get('Oldest', [0, 0, 0])
+        base['TotalCommits'] += stats['TotalCommits']
+        base['FaultCount'] += stats['FaultCount'] + oldest[0]
+        base['Insertions'] += stats['Insertions'] + oldest[1]
+        base['Deletions'] += stats['Deletions'] + oldest[2]
+
+    return merged
+
+def scan_commit_range(task: Tuple[str, List[str], Optional[str]]) -> Tuple[Dict[str, Dict[str, int]], float]:
+    """
+    Map step of the parallel scan: aggregate one range of commits in a worker process.
+    """
+    repo_path, commits, cache_path = task
+    # CPU time of the worker and its git process, so contention for cores does not count as work
+    start = os.times()
+    commit_cache = CommitClassificationCache(cache_path)
+    history = LocalFaultDetector(repo_path, commit_cache).scan_history(commits=commits)
+    commit_cache.close()
+    end = os.times()
+    return history, sum(end[:4]) - sum(start[:4])
 
 # Main class to analyze a single Git repository for fault-proneness
 class LocalFaultDetector:
-    def __init__(self, repo_path: str):
+    def __init__(self, repo_path: str, commit_cache: Optional[CommitClassificationCache] = None):
         # Set path and initialize Git repo
         self.repo_path = Path(repo_path)
+        # Classifications are shared across files, and across runs when the cache is persistent
+        self.commit_cache = commit_cache if commit_cache is not None else CommitClassificationCache()
         try:
             self.repo = git.Repo(self.repo_path)
             # Get remote URL if available, else use local path
@@ -20,9 +181,26 @@ class LocalFaultDetector:
             raise ValueError(f"'{repo_path}' is not a valid Git repository")
 
     def is_bug_fix_commit(self, commit) -> bool:
+        # Look the SHA up first so cached commits never load their message
+        cached = self.commit_cache.get(commit.hexsha)
+        if cached is not None:
+            return cached
+        return self.classify_message(commit.message, commit.hexsha)
+
+    def is_bug_fix_message(self, message: str, sha: Optional[str] = None) -> bool:
         # Detect whether the commit message contains bug-fix keywords
-        bug_keywords = {'bug', 'fix', 'defect', 'fault', 'issue', 'error'}
-        return any(keyword in commit.message.lower() for keyword in bug_keywords)
+        if sha is not None:
+            cached = self.commit_cache.get(sha)
+            if cached is not None:
+                return cached
+        return self.classify_message(message, sha)
+
+    def classify_message(self, message: str, sha: Optional[str] = None) -> bool:
+        # Keyword check of a message the cache did not know, remembered under its SHA
+        is_bug_fix = any(keyword in message.lower() for keyword in BUG_KEYWORDS)
+        if sha is not None:
+            self.commit_cache.put(sha, is_bug_fix)
+        return is_bug_fix
 
     def calculate_file_changes(self, file_path: str) -> Dict[str, int]:
         """
@@ -70,6 +248,44 @@ class LocalFaultDetector:
             print(f"Error calculating changes for {file_path}: {e}")
             return {'TotalCommits': 0, 'Insertions': 0, 'Deletions': 0}
 
+    def calculate_all_file_changes(self, file_paths: List[str]) -> Dict[str, Dict[str, int]]:
+        """
+        Batched calculate_file_changes for many files, answering every commit pair through one git process.
+        """
+        backend = BatchedDiffBackend(self.repo_path, pathspecs=['*.py'])
+        file_pairs = {}
+
+        for file_path in file_paths:
+            try:
+                commits = list(self.repo.iter_commits(paths=file_path))
+            except Exception as e:
+                print(f"Error calculating changes for {file_path}: {e}")
+                commits = []
+
+            pairs = [(commits[i + 1].hexsha, commits[i].hexsha) for i in range(len(commits) - 1)]
+            for parent, child in pairs:
+                backend.request(parent, child, file_path)
+            file_pairs[file_path] = (len(commits), pairs)
+
+        backend.resolve()
+
+        all_changes = {}
+        for file_path, (total_commits, pairs) in file_pairs.items():
+            total_insertions = 0
+            total_deletions = 0
+            for parent, child in pairs:
+                insertions, deletions = backend.numstat(parent, child, file_path)
+                total_insertions += insertions
+                total_deletions += deletions
+
+            all_changes[file_path] = {
+                'TotalCommits': total_commits,
+                'Insertions': total_insertions,
+                'Deletions': total_deletions
+            }
+
+        return all_changes
+
     def get_file_versions(self, file_path: str) -> List[Tuple[git.Commit, bool]]:
         """
         Track each version of the file and flag whether it was involved in a bug-fix.
@@ -91,16 +307,227 @@ class LocalFaultDetector:
         except git.exc.GitCommandError:
             return []
 
-    def analyze_file_history(self, file_path: str) -> Tuple[bool, Dict[str, int], int]:
+    def analyze_file_history(self, file_path: str, changes: Dict[str, int] = None) -> Tuple[bool, Dict[str, int], int]:
         """
         Combine fault detection and code churn for a single file.
         """
         versions = self.get_file_versions(file_path)
         is_faulty = any(is_faulty for _, is_faulty, _ in versions)
         fault_count = versions[-1][2] if versions else 0
-        changes = self.calculate_file_changes(file_path)
+        if changes is None:
+            changes = self.calculate_file_changes(file_path)
         return is_faulty, changes, fault_count
 
+    def iter_numstat_log(self, revision_range: str = 'HEAD',
+                         commits: Optional[List[str]] = None) -> Iterator[Tuple[str, str, List[Tuple[str, int, int]]]]:
+        """
+        Stream (sha, message, [(path, insertions, deletions), ...]) for every commit, newest first, from one git log process.
+        """
+        # An explicit commit list is read from stdin and shown in the given order instead of walking revision_range
+        revisions = ['--stdin', '--no-walk=unsorted'] if commits is not None else [revision_range]
+        log_command = [
+            'git', '-C', str(self.repo_path),
+            'log', '-z', '--full-history', '--no-merges', '--no-renames', '--numstat',
+            '--format=%x01%H%x02%B%x03',
+            *revisions, '--', '*.py'
+        ]
+        process = subprocess.Popen(
+            log_command, stdout=subprocess.PIPE,
+            stdin=subprocess.PIPE if commits is not None else None
+        )
+        if commits is not None:
+            # git log reads all of stdin before it starts printing
+            process.stdin.write(''.join(f'{sha}\n' for sha in commits).encode())
+            process.stdin.close()
+        sha, message, files = None, '', []
+        buffer = b''
+
+        try:
+            while True:
+                chunk = process.stdout.read(1 << 16)
+                if not chunk:
+                    break
+                buffer += chunk
+                *tokens, buffer = buffer.split(b'\0')
+
+                # Each NUL-terminated token is either a commit header or one numstat line
+                for token in tokens:
+                    token = token.decode('utf-8', errors='surrogateescape').lstrip('\n')
+                    if token.startswith('\x01'):
+                        if sha is not None:
+                            yield sha, message, files
+                        sha, _, message = token[1:].partition('\x02')
+                        message = message.rpartition('\x03')[0]
+                        files = []
+                    elif token:
+                        insertions, deletions, path = token.split('\t', 2)
+                        # Binary files report '-' and count as no line changes
+                        files.append((
+                            path,
+                            int(insertions) if insertions.isdigit() else 0,
+                            int(deletions) if deletions.isdigit() else 0
+                        ))
+        finally:
+            process.stdout.close()
+            process.wait()
+
+        if sha is not None:
+            yield sha, message, files
+
+    def scan_history(self, revision_range: str = 'HEAD', commits: Optional[List[str]] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Aggregate fault and churn metrics for every file in a single pass over the history.
+        """
+        history = {}
+        # The log runs newest first, so the last commit seen for a file is its oldest one.
+        # Like the per-file mode, that commit counts towards TotalCommits only.
+        pending = {}
+
+        for sha, message, files in self.iter_numstat_log(revision_range, commits):
+            is_faulty = self.is_bug_fix_message(message, sha)
+            for path, insertions, deletions in files:
+                stats = history.setdefault(path, {
+                    'TotalCommits': 0, 'Insertions': 0, 'Deletions': 0, 'FaultCount': 0
+                })
+                stats['TotalCommits'] += 1
+
+                previous = pending.get(path)
+                if previous is not None:
+                    stats['FaultCount'] += previous[0]
+                    stats['Insertions'] += previous[1]
+                    stats['Deletions'] += previous[2]
+                pending[path] = (int(is_faulty), insertions, deletions)
+
+        # Keep the held-out commit so results of adjacent ranges can be merged later
+        for path, oldest in pending.items():
+            history[path]['Oldest'] = list(oldest)
+
+        return history
+
+    def scan_history_parallel(self, workers: Optional[int] = None) -> Dict[str, Dict[str, int]]:
+        """
+        scan_history split into disjoint commit ranges over a process pool, then merged in history order.
+        """
+        workers = workers or os.cpu_count() or 1
+        commits = subprocess.check_output(
+            ['git', '-C', str(self.repo_path), 'rev-list', '--full-history', '--no-merges', 'HEAD', '--', '*.py'],
+            universal_newlines=True
+        ).split()
+
+        range_count = min(workers, len(commits) // MIN_COMMITS_PER_RANGE)
+        if range_count <= 1:
+            return self.scan_history()
+
+        range_size = -(-len(commits) // range_count)
+        tasks = [
+            (str(self.repo_path), commits[i:i + range_size], self.commit_cache.db_path)
+            for i in range(0, len(commits), range_size)
+        ]
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=range_count) as pool:
+            partials = list(pool.map(scan_commit_range, tasks))
+        wall_time = time.perf_counter() - start
+
+        # Ranges are listed newest first, so fold them from the oldest one upwards
+        history = {}
+        for partial, _ in reversed(partials):
+            history = merge_history(history, partial)
+
+        busy_time = sum(cpu_time for _, cpu_time in partials)
+        print(f"🔀 Map-reduce over {len(tasks)} ranges of {range_size} commits: {wall_time:.2f}s wall, "
+              f"{busy_time:.2f}s CPU in workers, speedup {busy_time / wall_time:.1f}x, "
+              f"efficiency {busy_time / (wall_time * len(tasks)):.0%}")
+        return history
+
+    def is_ancestor_of_head(self, sha: str) -> bool:
+        result = subprocess.run(
+            ['git', '-C', str(self.repo_path), 'merge-base', '--is-ancestor', sha, 'HEAD'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        return result.returncode == 0
+
+    def pruned_commits(self, followed: str, other_parents: List[str]) -> List[str]:
+        """
+        Commits a merge's other parents reach and its followed parent does not.
+        """
+        return subprocess.check_output(
+            ['git', '-C', str(self.repo_path), 'rev-list', *other_parents, '--not', followed],
+            universal_newlines=True
+        ).split()
+
+    def nonlinear_paths(self, revision_range: str = 'HEAD') -> Set[str]:
+        """
+        Files for which the history scan and the per-file walk disagree at a merge in revision_range.
+        The scan counts every non-merge commit once. The per-file walk follows git's history simplification:
+        at a merge it only follows the first parent whose version of the file the merge kept, and it counts
+        the merge itself when the merge kept no parent's version. Files changed by a merge, or by a commit
+        only the parents the per-file walk does not follow reach, are listed here.
+        """
+        merges = subprocess.check_output(
+            ['git', '-C', str(self.repo_path), 'rev-list', '--merges', '--parents', revision_range],
+            universal_newlines=True
+        ).splitlines()
+
+        if not merges:
+            return set()
+
+        # Python files of every non-merge commit; sides of a merge in the range can reach commits before it
+        touched = {sha: [path for path, _, _ in files] for sha, _, files in self.iter_numstat_log()}
+        backend = BatchedDiffBackend(self.repo_path, pathspecs=['*.py'])
+        plans = []
+        for line in merges:
+            merge, *parents = line.split()
+            for parent in parents:
+                backend.request(parent, merge)
+            plans.append((merge, parents))
+        backend.resolve()
+
+        paths = set()
+        for merge, parents in plans:
+            # Files the merge changed against each of its parents
+            changed_from = [backend.changed_paths(parent, merge) for parent in parents]
+            paths |= set.intersection(*changed_from)
+            for side, parent in enumerate(parents):
+                # The per-file walk follows this parent for the files the merge kept from it and from no earlier parent
+                commits = self.pruned_commits(parent, parents[:side] + parents[side + 1:])
+                pruned = set().union(*(touched.get(sha, ()) for sha in commits)) - changed_from[side]
+                paths |= {path for path in pruned if all(path in changed for changed in changed_from[:side])}
+        return paths
+
+    def scan_history_incremental(self, state_file: str) -> Tuple[Dict[str, Dict[str, int]], Set[str]]:
+        """
+        scan_history and nonlinear_paths that only walk the commits added since the HEAD saved in state_file.
+        """
+        head = self.repo.head.commit.hexsha
+        state = None
+        if os.path.exists(state_file):
+            try:
+                with open(state_file) as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                state = None
+
+        # Rewritten history or changed bug-fix rules make the saved aggregates unusable
+        last_head = state.get('Head') if state else None
+        if last_head and state.get('RulesVersion') == BUG_RULES_VERSION and self.is_ancestor_of_head(last_head):
+            history = state['Files']
+            nonlinear = set(state['Nonlinear']) if 'Nonlinear' in state else self.nonlinear_paths(last_head)
+            if last_head != head:
+                history = merge_history(history, self.scan_history(f'{last_head}..{head}'))
+                nonlinear |= self.nonlinear_paths(f'{last_head}..{head}')
+        else:
+            history = self.scan_history(head)
+            nonlinear = self.nonlinear_paths(head)
+
+        os.makedirs(os.path.dirname(os.path.abspath(state_file)), exist_ok=True)
+        temp_file = f'{state_file}.tmp'
+        with open(temp_file, 'w') as f:
+            json.dump({'Head': head, 'RulesVersion': BUG_RULES_VERSION, 'Files': history, 'Nonlinear': sorted(nonlinear)}, f)
+        os.replace(temp_file, state_file)
+
+        return history, nonlinear
+
     def get_python_files(self) -> List[str]:
         """
         Get all .py files in the repository.
@@ -113,15 +540,49 @@ class LocalFaultDetector:
                     python_files.append(rel_path)
         return python_files
 
-    def analyze_repository(self) -> List[Tuple[str, str, int, int, int, int, int]]:
+    def analyze_file_history_from_scan(self, file_path: str, history: Dict[str, Dict[str, int]]) -> Tuple[bool, Dict[str, int], int]:
+        """
+        Same result as analyze_file_history, looked up from a scan_history result.
+        """
+        stats = history.get(file_path.replace(os.sep, '/'))
+        if stats is None:
+            return False, {'TotalCommits': 0, 'Insertions': 0, 'Deletions': 0}, 0
+
+        changes = {key: stats[key] for key in ('TotalCommits', 'Insertions', 'Deletions')}
+        return stats['FaultCount'] > 0, changes, stats['FaultCount']
+
+    def analyze_repository(self, mode: str = 'per-file', diff_backend: str = 'subprocess',
+                           state_file: Optional[str] = None,
+                           workers: Optional[int] = None) -> List[Tuple[str, str, int, int, int, int, int]]:
         """
         Analyze all Python files in the repository.
         """
         results = []
         python_files = self.get_python_files()
+        history = None
+        nonlinear = set()
+        if mode == 'single-pass':
+            history = self.scan_history()
+            nonlinear = self.nonlinear_paths()
+        elif mode == 'incremental':
+            history, nonlinear = self.scan_history_incremental(state_file)
+        elif mode == 'map-reduce':
+            history = self.scan_history_parallel(workers)
+            nonlinear = self.nonlinear_paths()
+        # Files whose history goes through a merge are walked per file in every mode, so all modes agree;
+        # the batched backend otherwise only applies to the per-file mode, the scans read churn from their own log
+        per_file = [file_path for file_path in python_files if file_path.replace(os.sep, '/') in nonlinear]
+        all_changes = {}
+        if history is None and diff_backend == 'batched':
+            all_changes = self.calculate_all_file_changes(python_files)
+        elif history is not None and per_file:
+            all_changes = self.calculate_all_file_changes(per_file)
 
         for file_path in python_files:
-            is_faulty, changes, fault_count = self.analyze_file_history(file_path)
+            if history is not None and file_path.replace(os.sep, '/') not in nonlinear:
+                is_faulty, changes, fault_count = self.analyze_file_history_from_scan(file_path, history)
+            else:
+                is_faulty, changes, fault_count = self.analyze_file_history(file_path, all_changes.get(file_path))
             results.append((
                 self.remote_url,         # Repository
                 file_path,               # File path
@@ -134,31 +595,42 @@ class LocalFaultDetector:
 
         return results
 
-# Analyze one project and write results to CSV
-def process_project(project_path: str, output_dir: str):
+# Analyze one project and write results to CSV; errors propagate, so a scheduled project that fails
+# or runs out of memory exits with a failing status
+def process_project(project_path: str, output_dir: str, mode: str = 'per-file', diff_backend: str = 'subprocess',
+                    commit_cache: Optional[CommitClassificationCache] = None, state_dir: Optional[str] = None,
+                    workers: Optional[int] = None):
     os.makedirs(output_dir, exist_ok=True)
     project_name = os.path.basename(project_path)
     output_file = os.path.join(output_dir, f'{project_name}_fault_proneness.csv')
+    # Incremental runs keep per-project aggregates next to the results unless told otherwise
+    state_file = os.path.join(state_dir or os.path.join(output_dir, 'fp_state'), f'{project_name}.json')
 
-    try:
-        detector = LocalFaultDetector(project_path)
-        results = detector.analyze_repository()
+    detector = LocalFaultDetector(project_path, commit_cache)
+    results = detector.analyze_repository(mode, diff_backend, state_file, workers)
+    detector.commit_cache.flush()
 
-        # Write the results to CSV
-        with open(output_file, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                'Repository', 'File', 'Is_Faulty',
-                'TotalCommits', 'Insertions', 'Deletions', 'FaultCount'
-            ])
-            for row in results:
-                writer.writerow(row)
+    # Write the results to CSV
+    with open(output_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            'Repository', 'File', 'Is_Faulty',
+            'TotalCommits', 'Insertions', 'Deletions', 'FaultCount'
+        ])
+        for row in results:
+            writer.writerow(row)
 
-        print(f"✅ Analysis complete for {project_name}. Processed {len(results)} files.")
-        print(f"📄 Results saved to: {output_file}")
+    print(f"✅ Analysis complete for {project_name}. Processed {len(results)} files.")
+    print(f"📄 Results saved to: {output_file}")
 
-    except Exception as e:
-        print(f"❌ Error analyzing project {project_name}: {str(e)}")
+# Scheduler entry point: every project process opens its own handle on the shared cache file
+def process_project_job(project_path: str, output_dir: str, mode: str, diff_backend: str,
+                        cache_path: Optional[str], state_dir: Optional[str], workers: Optional[int]):
+    commit_cache = CommitClassificationCache(cache_path)
+    try:
+        process_project(project_path, output_dir, mode, diff_backend, commit_cache, state_dir, workers)
+    finally:
+        commit_cache.close()
 
 # Command-line runner
 def main():
@@ -169,18 +641,49 @@ def main():
     parser = argparse.ArgumentParser(description='Detect fault-prone files in Git repositories')
     parser.add_argument('--input_dir', help='Directory containing Git repositories', default=default_input)
     parser.add_argument('--output_dir', help='Output directory path', default=default_output)
+    parser.add_argument('--mode', choices=['per-file', 'single-pass', 'incremental', 'map-reduce'], default='per-file',
+                        help='per-file walks the history once per file, single-pass streams it once per repository, '
+                             'incremental is single-pass over the commits added since the previous incremental run, '
+                             'map-reduce is single-pass split over commit ranges in a process pool; '
+                             'files whose history a merge makes non-linear are walked per file in every mode, so all modes give the same rows')
+    parser.add_argument('--diff_backend', choices=['subprocess', 'batched'], default='subprocess',
+                        help='per-file mode only: one git diff per commit pair, or one git diff-tree process per repository')
+    parser.add_argument('--commit_cache', help='SQLite file that keeps bug-fix classifications across runs and projects')
+    parser.add_argument('--workers', type=int, help='Processes per repository in map-reduce mode (default: CPU count)')
+    parser.add_argument('--state_dir', help='Where incremental mode keeps per-project aggregates (default: <output_dir>/fp_state)')
+    parser.add_argument('--jobs', type=int, help='Analyze this many projects concurrently, largest repository first')
+    parser.add_argument('--timeout', type=float, help='Seconds after which a project is killed (scheduled runs)')
+    parser.add_argument('--memory_limit', type=int, help='Memory cap per project in MB (scheduled runs)')
     args = parser.parse_args()
 
     os.makedirs(args.output_dir, exist_ok=True)
+    project_paths = [
+        os.path.join(args.input_dir, project_name) for project_name in os.listdir(args.input_dir)
+        if os.path.isdir(os.path.join(args.input_dir, project_name))
+    ]
 
-    # Loop over all project directories and process each
-    for project_name in os.listdir(args.input_dir):
-        project_path = os.path.join(args.input_dir, project_name)
+    # Run each project in its own process when concurrency or per-project limits are requested
+    if args.jobs or args.timeout or args.memory_limit:
+        jobs = [
+            ProjectJob(os.path.basename(project_path), project_path, process_project_job,
+                       (project_path, args.output_dir, args.mode, args.diff_backend,
+                        args.commit_cache, args.state_dir, args.workers))
+            for project_path in project_paths
+        ]
+        run_projects(jobs, args.jobs or 1, args.timeout, args.memory_limit)
+        return
 
-        if not os.path.isdir(project_path):
-            continue
+    commit_cache = CommitClassificationCache(args.commit_cache)
+
+    # Loop over all project directories and process each
+    for project_path in project_paths:
+        try:
+            process_project(project_path, args.output_dir, args.mode, args.diff_backend, commit_cache, args.state_dir,
+                            args.workers)
+        except Exception as e:
+            print(f"❌ Error analyzing project {os.path.basename(project_path)}: {str(e)}")
 
-        process_project(project_path, args.output_dir)
+    commit_cache.close()
 
 if __name__ == "__main__":
     main()
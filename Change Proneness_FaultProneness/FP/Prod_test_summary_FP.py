@@ -1,5 +1,12 @@
+import os
+import sys
 import pandas as pd
 
+# The test-file classifier is shared by every stage and lives in the parent folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from TestFileClassifier import classify_test_paths
+from SubstringMatcher import match_substrings
+
 def map_production_test_files(df):
     """
     Maps production files with their associated test files and fault status.
@@ -24,34 +31,39 @@ def map_production_test_files(df):
     file_path_column = df.columns[0]  # Assuming file path is the first column
     is_faulty_column = [col for col in df.columns if 'faulty' in col.lower()][0]  # Find column with 'faulty' in name
     
+    # Classify the whole path column at once
+    test_flags = classify_test_paths(df[file_path_column])
+    
     # Process each row in the DataFrame
-    for _, row in df.iterrows():
-        file_path = row[file_path_column]
-        is_faulty = row[is_faulty_column]
-        
+    for file_path, is_faulty, is_test in zip(df[file_path_column], df[is_faulty_column], test_flags):
         # Check if file is a test file
-        if 'test' in str(file_path).lower():
+        if is_test:
             test_fault_status[file_path] = is_faulty
         else:
             production_fault_status[file_path] = is_faulty
     
+    # Base name of every production file, matched case-insensitively anywhere in the test paths
+    base_names = {
+        prod_file: str(prod_file).split('/')[-1].replace('.py', '').lower()
+        for prod_file in production_fault_status.keys()
+    }
+    test_paths = list(test_fault_status.keys())
+    
+    # One automaton pass over the test paths finds the matching tests of every base name
+    matches = match_substrings(base_names.values(), (str(test_file).lower() for test_file in test_paths))
+    
     # Map production files to test files
     for prod_file in production_fault_status.keys():
-        base_name = str(prod_file).split('/')[-1].replace('.py', '')
-        
-        # Look for associated test files
-        found_test = False
-        for test_file in test_fault_status.keys():
-            if base_name.lower() in str(test_file).lower():
-                production_files.append(prod_file)
-                production_faulty.append(production_fault_status[prod_file])
-                test_files.append(test_file)
-                test_faulty.append(test_fault_status[test_file])
-                found_test = True
-                break
-        
-        # If no test file found, still include the production file
-        if not found_test:
+        # The first test file containing the base name is the associated one
+        matching_tests = matches.get(base_names[prod_file])
+        if matching_tests:
+            test_file = test_paths[matching_tests[0]]
+            production_files.append(prod_file)
+            production_faulty.append(production_fault_status[prod_file])
+            test_files.append(test_file)
+            test_faulty.append(test_fault_status[test_file])
+        else:
+            # If no test file found, still include the production file
             production_files.append(prod_file)
             production_faulty.append(production_fault_status[prod_file])
             test_files.append(None)
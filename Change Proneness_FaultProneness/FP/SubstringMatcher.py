@@ -0,0 +1,84 @@
+from collections import deque
+from typing import Dict, Iterable, List
+
+# Aho-Corasick automaton: finds which of many patterns occur in a text in one pass over the text,
+# so matching P production base names against T test paths costs O(length of all paths + matches)
+# instead of P x T substring scans.
+class SubstringMatcher:
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = list(dict.fromkeys(patterns))
+        # The empty pattern occurs in every text and has no node of its own
+        self.empty_index = self.patterns.index('') if '' in self.patterns else None
+
+        # Node 0 is the root; every node has its transitions, a failure link and the patterns ending there
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.ends: List[List[int]] = [[]]
+        # Nearest node on the failure chain that ends a pattern, so matches are reported without walking the whole chain
+        self.output_link: List[int] = [0]
+
+        for index, pattern in enumerate(self.patterns):
+            if pattern:
+                self._add_pattern(pattern, index)
+        self._build_links()
+
+    def _add_pattern(self, pattern: str, index: int):
+        node = 0
+        for char in pattern:
+            next_node = self.goto[node].get(char)
+            if next_node is None:
+                next_node = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.ends.append([])
+                self.output_link.append(0)
+                self.goto[node][char] = next_node
+            node = next_node
+        self.ends[node].append(index)
+
+    def _build_links(self):
+        """Breadth-first pass setting each node's failure link to its longest proper suffix in the trie"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[child] = target if target != child else 0
+                self.output_link[child] = target if self.ends[target] else self.output_link[target]
+                queue.append(child)
+
+    def find(self, text: str) -> List[int]:
+        """Indices into self.patterns of every pattern occurring in text, each reported once"""
+        found = set()
+        node = 0
+        for char in text:
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+
+            match = node if self.ends[node] else self.output_link[node]
+            while match:
+                if self.ends[match][0] in found:
+                    # Everything further down this output chain was already reported for this text
+                    break
+                found.update(self.ends[match])
+                match = self.output_link[match]
+
+        if self.empty_index is not None:
+            found.add(self.empty_index)
+        return sorted(found)
+
+def match_substrings(patterns: Iterable[str], texts: Iterable[str]) -> Dict[str, List[int]]:
+    """
+    Map every pattern to the positions of the texts containing it, in text order.
+    Patterns that occur in no text are left out.
+    """
+    matcher = SubstringMatcher(patterns)
+    matches = {}
+    for position, text in enumerate(texts):
+        for index in matcher.find(text):
+            matches.setdefault(matcher.patterns[index], []).append(position)
+    return matches
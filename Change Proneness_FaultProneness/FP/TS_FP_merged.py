@@ -1,22 +1,10 @@
+import os
+import sys
 import pandas as pd
 
-# Read the CSV files
-test_smells_path = '.../TS.csv'
-fault_proneness_path = '.../FP.csv'
-output_path = '.../TS_FP/'
-
-# Read CSVs
-test_smells_df = pd.read_csv(test_smells_path)
-fault_proneness_df = pd.read_csv(fault_proneness_path)
-
-# Merge dataframes on TestFile column
-merged_df = pd.merge(
-    test_smells_df,
-    fault_proneness_df,
-    left_on='TestFile',
-    right_on='TestFile',
-    how='inner'
-)
+# Path interning is shared by every stage and lives in the parent folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PathDictionary import PathDictionary, read_csv_interned, suffixed_columns
 
 # Reorganize columns to have test smells first, then fault data
 smell_columns = [
@@ -51,18 +39,44 @@ fault_columns = [
 # Select and reorder columns
 final_columns = smell_columns + fault_columns
 
-# Select only the desired columns that exist in the merged dataframe
-existing_columns = [col for col in final_columns if col in merged_df.columns]
-final_df = merged_df[existing_columns]
+def merge_smells_with_faults(test_smells_path, fault_proneness_path, output_path):
+    # Read CSVs, with every path column interned as an int32 id shared by both files
+    paths = PathDictionary()
+    test_smells_df = read_csv_interned(test_smells_path, paths)
+    fault_proneness_df = read_csv_interned(fault_proneness_path, paths)
+
+    # Merge dataframes on TestFile column
+    merged_df = pd.merge(
+        test_smells_df,
+        fault_proneness_df,
+        left_on='TestFile',
+        right_on='TestFile',
+        how='inner'
+    )
+
+    # Select only the desired columns that exist in the merged dataframe
+    existing_columns = [col for col in final_columns if col in merged_df.columns]
+    final_df = merged_df[existing_columns].copy()
+
+    # Paths are only turned back into text for the output
+    paths.decode_columns(final_df, suffixed_columns(final_df))
+
+    # Save the final merged dataframe
+    output_file = output_path + 'combined_metrics.csv'
+    final_df.to_csv(output_file, index=False)
+
+    # Print summary statistics
+    print(f"Original number of rows in test smells file: {len(test_smells_df)}")
+    print(f"Original number of rows in fault proneness file: {len(fault_proneness_df)}")
+    print(f"Number of rows in merged file: {len(final_df)}")
+    print(f"\nColumns in final file:")
+    for col in final_df.columns:
+        print(f"- {col}")
 
-# Save the final merged dataframe
-output_file = output_path + 'combined_metrics.csv'
-final_df.to_csv(output_file, index=False)
+if __name__ == "__main__":
+    # Read the CSV files
+    test_smells_path = '.../TS.csv'
+    fault_proneness_path = '.../FP.csv'
+    output_path = '.../TS_FP/'
 
-# Print summary statistics
-print(f"Original number of rows in test smells file: {len(test_smells_df)}")
-print(f"Original number of rows in fault proneness file: {len(fault_proneness_df)}")
-print(f"Number of rows in merged file: {len(final_df)}")
-print(f"\nColumns in final file:")
-for col in final_df.columns:
-    print(f"- {col}")
\ No newline at end of file
+    merge_smells_with_faults(test_smells_path, fault_proneness_path, output_path)
\ No newline at end of file
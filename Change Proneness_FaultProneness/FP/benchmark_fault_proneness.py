@@ -0,0 +1,66 @@
+import argparse
+import os
+import tempfile
+import time
+
+from FaultProneness import CommitClassificationCache, LocalFaultDetector
+
+# Compare the per-file mode of LocalFaultDetector against its faster variants on the same repositories
+def time_mode(repo_path: str, mode: str, repeat: int, diff_backend: str = 'subprocess'):
+    """
+    Run analyze_repository in the given mode and return (best wall-clock seconds, rows).
+    Every run gets a new detector with an empty classification cache, so no mode reuses the work of another.
+    """
+    best = None
+    rows = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            commit_cache = CommitClassificationCache(os.path.join(cache_dir, 'commits.db'))
+            detector = LocalFaultDetector(repo_path, commit_cache)
+            start = time.perf_counter()
+            rows = detector.analyze_repository(mode, diff_backend)
+            elapsed = time.perf_counter() - start
+            commit_cache.close()
+        best = elapsed if best is None else min(best, elapsed)
+    return best, rows
+
+def compare_rows(per_file_rows, other_rows):
+    """
+    Count files whose output row is identical in both runs and list the ones that differ.
+    """
+    other_by_file = {row[1]: row for row in other_rows}
+    mismatches = [row[1] for row in per_file_rows if other_by_file.get(row[1]) != row]
+    return len(per_file_rows) - len(mismatches), mismatches
+
+def benchmark_repository(repo_path: str, repeat: int):
+    project_name = os.path.basename(os.path.normpath(repo_path))
+
+    per_file_time, per_file_rows = time_mode(repo_path, 'per-file', repeat)
+    print(f"\nProject: {project_name}")
+    print(f"Python files: {len(per_file_rows)}")
+    print(f"per-file:             {per_file_time:.2f}s")
+
+    variants = [
+        ('per-file (batched)', 'per-file', 'batched'),
+        ('single-pass', 'single-pass', 'subprocess'),
+        ('map-reduce', 'map-reduce', 'subprocess'),
+    ]
+    for label, mode, diff_backend in variants:
+        elapsed, rows = time_mode(repo_path, mode, repeat, diff_backend)
+        matching, mismatches = compare_rows(per_file_rows, rows)
+        print(f"{label + ':':<22}{elapsed:.2f}s  "
+              f"speedup {per_file_time / elapsed:.1f}x, identical rows {matching}/{len(per_file_rows)}")
+        for file_path in mismatches[:5]:
+            print(f"  differs: {file_path}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the fault-proneness analysis modes against each other')
+    parser.add_argument('repos', nargs='+', help='Git repositories to benchmark')
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per mode, the best time is reported')
+    args = parser.parse_args()
+
+    for repo_path in args.repos:
+        benchmark_repository(repo_path, args.repeat)
+
+if __name__ == "__main__":
+    main()
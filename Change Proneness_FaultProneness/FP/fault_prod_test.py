@@ -34,25 +34,62 @@ def check_folder_structure(prod_path, test_path):
     
     return True
 
+# Test folders that may hold a test file for a production file in any folder
+GENERIC_TEST_DIRS = {'test', 'tests', 'unit', 'integration'}
+
+def get_path_key(path, is_test):
+    """
+    Split a path into the parts check_folder_structure compares:
+    (base name, parent folder, depth).
+    """
+    parts = path.split('/')
+    base = parts[-1]
+    if is_test:
+        base = base.replace('test_', '')
+    parent = parts[-2] if len(parts) > 1 else ''
+    return base.replace('.py', ''), parent, len(parts)
+
+def build_test_index(test_files):
+    """
+    Index test files by (base name, parent folder, depth), keeping the first test file of each key.
+    Test files in a generic test folder are stored under None, since they match a production file in any folder.
+    """
+    index = {}
+    for position, test_file in enumerate(test_files):
+        base, parent, depth = get_path_key(test_file, is_test=True)
+        folder = None if parent in GENERIC_TEST_DIRS else parent
+        index.setdefault((base, folder, depth), position)
+    return index
+
+def find_test_match(index, prod_file):
+    """
+    Position of the first test file that check_folder_structure accepts for prod_file, or None.
+    """
+    base, parent, depth = get_path_key(prod_file, is_test=False)
+    # Paths more than two levels apart never match, so only five depths need a lookup per folder
+    candidates = [
+        index.get((base, folder, test_depth))
+        for folder in (parent, None)
+        for test_depth in range(depth - 2, depth + 3)
+    ]
+    candidates = [position for position in candidates if position is not None]
+    return min(candidates) if candidates else None
+
 def map_prod_to_test(prod_df, test_df):
     """Map production files to their corresponding test files using folder structure similarity"""
     matched_pairs = []
+    test_rows = test_df.to_dict('records')
+    index = build_test_index([test_row['File'] for test_row in test_rows])
     
-    for _, prod_row in prod_df.iterrows():
+    for prod_row in prod_df.to_dict('records'):
         prod_file = prod_row['File']
-        best_match = None
-        
-        for _, test_row in test_df.iterrows():
-            test_file = test_row['File']
-            
-            if check_folder_structure(prod_file, test_file):
-                best_match = test_file
-                break  # Stop searching if a match is found
+        position = find_test_match(index, prod_file)
         
-        if best_match:
+        if position is not None:
+            test_row = test_rows[position]
             matched_pairs.append({
                 'ProductionFile': prod_file,
-                'TestFile': best_match,
+                'TestFile': test_row['File'],
                 'Prod_Is_Faulty': prod_row['Is_Faulty'],
                 'Prod_TotalCommits': prod_row['TotalCommits'],
                 'Prod_Insertions': prod_row['Insertions'],
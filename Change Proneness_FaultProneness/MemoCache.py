@@ -0,0 +1,69 @@
+import os
+import sqlite3
+from typing import Optional
+
+# Key-value memo of computed results, tagged with the version of the code that computed them.
+# Results live in memory and, when a path is given, in one SQLite table shared by later runs;
+# entries made by another version are ignored and replaced on the next flush.
+class MemoCache:
+    def __init__(self, db_path: Optional[str] = None, version: str = '', table: str = 'results'):
+        self.db_path = db_path
+        self.version = version
+        self.table = table
+        self.memo = {}
+        self.unsaved = {}
+        self.connection = None
+        self.hits = 0
+        self.misses = 0
+
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self.connection = sqlite3.connect(db_path, timeout=60)
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute(
+                f'CREATE TABLE IF NOT EXISTS {table} ('
+                'key TEXT PRIMARY KEY, version TEXT NOT NULL, result NOT NULL)'
+            )
+            self.connection.commit()
+
+    def get(self, key: str):
+        """
+        Result stored under a key, or None if unknown or produced by another version.
+        """
+        result = self.memo.get(key)
+        if result is None and self.connection is not None:
+            row = self.connection.execute(
+                f'SELECT result FROM {self.table} WHERE key = ? AND version = ?', (key, self.version)
+            ).fetchone()
+            if row is not None:
+                result = self.memo[key] = row[0]
+
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def put(self, key: str, result):
+        self.memo[key] = result
+        if self.connection is not None:
+            self.unsaved[key] = result
+
+    def flush(self):
+        """
+        Write new results to disk, replacing entries made by other versions of the code.
+        """
+        if self.connection is None or not self.unsaved:
+            return
+        self.connection.executemany(
+            f'INSERT OR REPLACE INTO {self.table} (key, version, result) VALUES (?, ?, ?)',
+            [(key, self.version, result) for key, result in self.unsaved.items()]
+        )
+        self.connection.commit()
+        self.unsaved.clear()
+
+    def close(self):
+        self.flush()
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
@@ -0,0 +1,120 @@
+import re
+from typing import Iterable, List
+
+import numpy as np
+import pandas as pd
+
+# Id given to missing paths; like NaN keys in pandas, missing ids still match each other in joins
+MISSING_ID = -1
+
+# Columns holding file paths in the CP/FP/smell tables
+PATH_COLUMNS = ['TestFile', 'ProductionFile', 'File Path']
+
+# Prefix the IDE inspection reports put in front of repository-relative paths
+PROJECT_DIR_PREFIX = 'file://$PROJECT_DIR$/'
+
+# Rewrites turning any spelling of a path into its repository-relative key, applied in order
+PATH_KEY_REWRITES = [
+    ('^' + re.escape(PROJECT_DIR_PREFIX), ''),  # inspection report prefix
+    (r'/+', '/'),                               # repeated separators
+    (r'/(?:\./)+', '/'),                        # ./ segments inside the path
+    (r'^(?:\./)+', ''),                         # leading ./
+    (r'/\.?$', ''),                             # trailing / or /.
+]
+
+def path_keys(paths: pd.Series) -> pd.Series:
+    """
+    Repository-relative join key of a column of paths: forward slashes, no inspection prefix,
+    no repeated separators or ./ segments. Two spellings of one file get the same key; missing paths stay NA.
+    """
+    try:
+        paths = paths.astype('string[pyarrow]')
+    except ImportError:
+        paths = paths.astype('string')
+
+    paths = paths.str.replace('\\', '/', regex=False)
+    for pattern, replacement in PATH_KEY_REWRITES:
+        paths = paths.str.replace(pattern, replacement, regex=True)
+    return paths
+
+class PathDictionary:
+    """
+    Interns file paths as int32 ids, so joins, groupbys and dedups hash small integers instead of long
+    repeated strings. Ids are handed out in order of first appearance and never change, so every table
+    encoded with the same dictionary can be joined on them; paths are only turned back into text for output.
+    """
+    def __init__(self):
+        # Position in the index is the id; lookups and additions are vectorized hash operations
+        self.index = None
+
+    def __len__(self):
+        return 0 if self.index is None else len(self.index)
+
+    def encode_values(self, paths: pd.Series) -> np.ndarray:
+        """int32 ids of a column of paths; every distinct path is looked up in the dictionary once"""
+        if isinstance(paths.dtype, pd.CategoricalDtype):
+            codes, uniques = paths.cat.codes.to_numpy(), pd.Index(paths.cat.categories)
+        else:
+            codes, uniques = pd.factorize(paths)
+            uniques = pd.Index(uniques)
+
+        if self.index is None:
+            unique_ids = np.arange(len(uniques))
+            self.index = uniques
+        else:
+            unique_ids = self.index.get_indexer(uniques)
+            new = unique_ids < 0
+            if new.any():
+                unique_ids[new] = np.arange(len(self.index), len(self.index) + new.sum())
+                self.index = self.index.append(uniques[new])
+
+        ids = np.full(len(codes), MISSING_ID, dtype=np.int32)
+        present = codes >= 0
+        ids[present] = unique_ids[codes[present]]
+        return ids
+
+    def encode(self, paths: pd.Series) -> pd.Series:
+        return pd.Series(self.encode_values(paths), index=paths.index, name=paths.name)
+
+    def decode(self, ids: pd.Series) -> pd.Series:
+        """Paths of a column of ids, missing where the path was missing"""
+        values = ids.to_numpy()
+        present = values != MISSING_ID
+        if not len(self) or not present.any():
+            return pd.Series(None, index=ids.index, name=ids.name, dtype=object)
+        # A native gather over the interned paths; missing ids are masked rather than taken
+        paths = self.index.take(np.where(present, values, 0))
+        return pd.Series(paths, index=ids.index, name=ids.name).where(present)
+
+    def encode_columns(self, df: pd.DataFrame, columns: Iterable[str] = PATH_COLUMNS) -> List[str]:
+        """
+        Replace the path columns of df by their ids in place and return the columns that were encoded.
+        The columns are stacked and encoded together, so a path shared by several columns is hashed once.
+        """
+        encoded = [column for column in columns if column in df.columns]
+        if not encoded:
+            return encoded
+        ids = self.encode_values(pd.concat([df[column] for column in encoded], ignore_index=True))
+        for i, column in enumerate(encoded):
+            df[column] = ids[i * len(df):(i + 1) * len(df)]
+        return encoded
+
+    def decode_columns(self, df: pd.DataFrame, columns: Iterable[str]):
+        """Turn id columns of df back into paths in place"""
+        for column in columns:
+            if column in df.columns:
+                df[column] = self.decode(df[column])
+
+def read_csv_interned(file_path: str, dictionary: PathDictionary, columns: Iterable[str] = PATH_COLUMNS) -> pd.DataFrame:
+    """Read a CSV and replace its path columns by their ids right away"""
+    df = pd.read_csv(file_path)
+    dictionary.encode_columns(df, columns)
+    return df
+
+def suffixed_columns(df: pd.DataFrame, columns: Iterable[str] = PATH_COLUMNS) -> List[str]:
+    """Path columns of a merge result, including the copies a merge renamed with a suffix"""
+    columns = list(columns)
+    return [
+        column for column in df.columns
+        if column in columns or any(column.startswith(f"{base}_") for base in columns)
+    ]
@@ -0,0 +1,236 @@
+import hashlib
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import pandas as pd
+
+from StageCache import StageCache, content_hash, stage_key
+
+# One step of a pipeline: target is called with the results of the stages named in inputs, in that order.
+# A per-project stage is instead called once per project as target(project, *that project's inputs) and
+# returns a dict with one entry per project; inputs of other per-project stages are passed project by project.
+# version identifies the stage's code for the cache. fingerprint describes what a stage reads from disk:
+# a string, or for a per-project stage a dict of one string per project, which also lists its projects.
+class Stage(NamedTuple):
+    name: str
+    target: Callable
+    inputs: Tuple[str, ...] = ()
+    per_project: bool = False
+    version: str = ''
+    fingerprint: Optional[Callable] = None
+
+class Output:
+    """
+    A stage result, or one project's entry of it, with the hash of its content when a cache is used.
+    Results found in the cache are only read from disk once a stage or the caller needs them.
+    """
+    def __init__(self, digest: Optional[str] = None, value=None, cache: Optional[StageCache] = None):
+        self.digest = digest
+        self.value = value
+        self.cache = cache
+
+    def get(self):
+        if self.cache is not None:
+            self.value = self.cache.load(self.digest)
+            self.cache = None
+        return self.value
+
+def input_digest(result) -> str:
+    """Hash of a whole input; a per-project input hashes the (project, hash) pairs of its entries"""
+    if isinstance(result, dict):
+        return hashlib.sha1(''.join(f"{project}\0{output.digest}\0" for project, output in sorted(result.items())).encode()).hexdigest()
+    return result.digest
+
+def input_value(result):
+    if isinstance(result, dict):
+        return {project: output.get() for project, output in result.items()}
+    return result.get()
+
+def stage_order(stages: List[Stage]) -> List[Stage]:
+    """
+    Stages sorted so every stage comes after the stages it reads, keeping the given order otherwise.
+    Raises ValueError for duplicate names, unknown inputs and cycles.
+    """
+    by_name = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise ValueError(f"Duplicate stage name: {stage.name}")
+        by_name[stage.name] = stage
+    for stage in stages:
+        for name in stage.inputs:
+            if name not in by_name:
+                raise ValueError(f"Stage {stage.name} reads unknown stage {name}")
+
+    order = []
+    placed = set()
+    pending = list(stages)
+    while pending:
+        ready = [stage for stage in pending if all(name in placed for name in stage.inputs)]
+        if not ready:
+            raise ValueError(f"Stages depend on each other in a cycle: {', '.join(stage.name for stage in pending)}")
+        for stage in ready:
+            order.append(stage)
+            placed.add(stage.name)
+        pending = [stage for stage in pending if stage.name not in placed]
+    for stage in stages:
+        if stage.per_project and not stage.fingerprint and not any(by_name[name].per_project for name in stage.inputs):
+            raise ValueError(f"Per-project stage {stage.name} needs a per-project input or a fingerprint listing its projects")
+    return order
+
+def write_result(result, output_path: str):
+    """
+    Materialize a stage result as CSV: a DataFrame goes to <output_path>.csv,
+    a dict of DataFrames to one <key>.csv per entry in the folder output_path.
+    """
+    if isinstance(result, pd.DataFrame):
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        result.to_csv(f"{output_path}.csv", index=False)
+    elif isinstance(result, dict):
+        os.makedirs(output_path, exist_ok=True)
+        for key, df in result.items():
+            df.to_csv(os.path.join(output_path, f"{key}.csv"), index=False)
+    else:
+        raise TypeError(f"Cannot write a {type(result).__name__} as CSV")
+
+def run_once(stage: Stage, inputs: list, cache: Optional[StageCache]) -> Tuple[Output, bool]:
+    """Run a whole stage unless the cache holds its output for these inputs; returns (output, computed)"""
+    key = None
+    if cache is not None and (stage.inputs or stage.fingerprint):
+        digests = [input_digest(result) for result in inputs]
+        if stage.fingerprint:
+            digests.append(stage.fingerprint())
+        key = stage_key(stage.name, stage.version, None, digests)
+        output = cache.lookup(key)
+        if output is not None:
+            return Output(output, cache=cache), False
+
+    value = stage.target(*[input_value(result) for result in inputs])
+    if key is not None:
+        return Output(cache.store(key, value), value), True
+    # Stages that cannot be cached still need a content hash, so the stages reading them can be cached
+    return Output(content_hash(value) if cache is not None else None, value), True
+
+def run_projects(stage: Stage, names: Tuple[str, ...], inputs: list, cache: Optional[StageCache]) -> Tuple[Dict[str, Output], int]:
+    """
+    Run a per-project stage for every project found in all its per-project inputs, skipping the projects
+    whose output the cache holds for the same inputs. Returns (output per project, projects computed).
+    """
+    fingerprints = stage.fingerprint() if stage.fingerprint else None
+    project_inputs = [(name, result) for name, result in zip(names, inputs) if isinstance(result, dict)]
+    candidates = list(fingerprints) if fingerprints is not None else list(project_inputs[0][1])
+
+    outputs = {}
+    computed = 0
+    for project in candidates:
+        missing = [name for name, result in project_inputs if project not in result]
+        if missing:
+            print(f"Skipping {project} in {stage.name}: no {', '.join(missing)} result")
+            continue
+
+        key = None
+        if cache is not None:
+            digests = [result[project].digest if isinstance(result, dict) else result.digest for result in inputs]
+            if fingerprints is not None:
+                digests.append(fingerprints[project])
+            key = stage_key(stage.name, stage.version, project, digests)
+            output = cache.lookup(key)
+            if output is not None:
+                outputs[project] = Output(output, cache=cache)
+                continue
+
+        value = stage.target(project, *[result[project].get() if isinstance(result, dict) else result.get() for result in inputs])
+        outputs[project] = Output(cache.store(key, value) if key is not None else None, value)
+        computed += 1
+    return outputs, computed
+
+def run_stage(stage: Stage, inputs: list, cache: Optional[StageCache], output_path: Optional[str]):
+    start = time.perf_counter()
+    if stage.per_project:
+        result, computed = run_projects(stage, stage.inputs, inputs, cache)
+        progress = f" ({computed} of {len(result)} projects computed)" if cache is not None else ''
+    else:
+        result, computed = run_once(stage, inputs, cache)
+        progress = ' (cached)' if not computed else ''
+    elapsed = time.perf_counter() - start
+
+    if output_path:
+        write_start = time.perf_counter()
+        write_result(input_value(result), output_path)
+        print(f"✅ {stage.name}: {elapsed:.1f}s{progress} (+{time.perf_counter() - write_start:.1f}s writing {output_path})")
+    else:
+        print(f"✅ {stage.name}: {elapsed:.1f}s{progress}")
+    return result
+
+def run_pipeline(stages: List[Stage], workers: Optional[int] = None, output_dir: Optional[str] = None,
+                 materialize: Iterable[str] = (), keep: Iterable[str] = (),
+                 cache: Optional[StageCache] = None) -> Dict[str, object]:
+    """
+    Run a graph of stages, starting every stage as soon as the stages it reads are done.
+
+    Results are handed from stage to stage as Python objects, so independent branches run side by side
+    on a thread pool without writing or pickling anything in between. A result is dropped as soon as its
+    last reader is done, unless it is a final stage or listed in keep. Only the stages listed in
+    materialize are written to output_dir as CSV.
+
+    With a StageCache, like make but per stage and per project, a stage or project is only computed again
+    when its code version, its fingerprint or the content of one of its inputs changed; otherwise its output
+    is taken from the cache, and only read from disk if something needs it.
+
+    Returns the results of the final stages and of the stages in keep.
+    """
+    order = stage_order(stages)
+    readers = {stage.name: 0 for stage in order}
+    for stage in order:
+        for name in stage.inputs:
+            readers[name] += 1
+
+    materialize = set(materialize)
+    unknown = materialize - set(readers)
+    if unknown:
+        raise ValueError(f"Cannot materialize unknown stages: {', '.join(sorted(unknown))}")
+    if materialize and not output_dir:
+        raise ValueError("Materializing stages needs an output folder")
+    keep = set(keep) | {name for name, count in readers.items() if count == 0}
+
+    # Stages mostly wait on pandas, file reads and worker processes, so by default every stage may run at once
+    workers = workers or len(order)
+    results = {}
+    done = set()
+    waiting = list(order)
+    running = {}
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while waiting or running:
+            # Start every stage whose inputs are all available
+            ready = [stage for stage in waiting if all(name in done for name in stage.inputs)]
+            for stage in ready:
+                waiting.remove(stage)
+                output_path = os.path.join(output_dir, stage.name) if stage.name in materialize else None
+                args = [results[name] for name in stage.inputs]
+                print(f"▶️ {stage.name}")
+                running[executor.submit(run_stage, stage, args, cache, output_path)] = stage
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage = running.pop(future)
+                try:
+                    results[stage.name] = future.result()
+                except Exception as e:
+                    # Stages already running finish, nothing new is started
+                    print(f"❌ {stage.name}: {e}")
+                    raise RuntimeError(f"Stage {stage.name} failed") from e
+                done.add(stage.name)
+
+                # Inputs nobody else reads are released right away
+                for name in stage.inputs:
+                    readers[name] -= 1
+                    if readers[name] == 0 and name not in keep:
+                        del results[name]
+
+    print(f"Pipeline finished in {time.perf_counter() - start:.1f}s")
+    if cache is not None:
+        print(f"Cache: {cache.hits} outputs reused, {cache.misses} computed")
+    return {name: input_value(results[name]) for name in keep}
@@ -0,0 +1,91 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+from typing import Iterable, Optional
+
+import pandas as pd
+
+def content_hash(value) -> str:
+    """
+    SHA-1 of a stage output: DataFrames are hashed column by column with pandas' vectorized row hashes,
+    dicts entry by entry, anything else through its pickle.
+    """
+    digest = hashlib.sha1()
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr([(str(column), str(dtype)) for column, dtype in value.dtypes.items()]).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, dict):
+        for key in sorted(value, key=str):
+            digest.update(f"{key}\0{content_hash(value[key])}\0".encode())
+    else:
+        digest.update(pickle.dumps(value))
+    return digest.hexdigest()
+
+def stage_key(stage: str, version: str, project: Optional[str], inputs: Iterable[str]) -> str:
+    """
+    Cache key of one run of a stage: its name, code version, project and the hashes of what it read.
+    The pandas version is part of it too, since stored outputs are pickled DataFrames.
+    """
+    parts = [stage, version, project or '', pd.__version__, *inputs]
+    return hashlib.sha1('\0'.join(parts).encode()).hexdigest()
+
+# Content-addressed store of stage outputs: objects are kept once under the hash of their content,
+# and a SQLite index maps every stage key to the output it produced
+class StageCache:
+    def __init__(self, cache_dir: str):
+        self.objects_dir = os.path.join(cache_dir, 'objects')
+        os.makedirs(self.objects_dir, exist_ok=True)
+        # Stages run on several threads and share the connection, one statement at a time
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(os.path.join(cache_dir, 'stages.db'), timeout=60, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS outputs (key TEXT PRIMARY KEY, output TEXT NOT NULL)')
+        self.connection.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def object_path(self, output: str) -> str:
+        return os.path.join(self.objects_dir, output[:2], f"{output}.pkl")
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Hash of the output stored for a stage key, or None if that run was never stored"""
+        with self.lock:
+            row = self.connection.execute('SELECT output FROM outputs WHERE key = ?', (key,)).fetchone()
+            output = row[0] if row is not None and os.path.exists(self.object_path(row[0])) else None
+            if output is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return output
+
+    def load(self, output: str):
+        with open(self.object_path(output), 'rb') as f:
+            return pickle.load(f)
+
+    def store(self, key: str, value) -> str:
+        """Keep the output of a stage run under its content hash and return that hash"""
+        output = content_hash(value)
+        path = self.object_path(output)
+        # Identical outputs of different runs share one object
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_file = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(temp_file, 'wb') as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temp_file, path)
+            finally:
+                if os.path.exists(temp_file):
+                    os.remove(temp_file)
+        with self.lock:
+            self.connection.execute('INSERT OR REPLACE INTO outputs (key, output) VALUES (?, ?)', (key, output))
+            self.connection.commit()
+        return output
+
+    def close(self):
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
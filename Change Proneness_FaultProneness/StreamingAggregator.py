@@ -0,0 +1,63 @@
+import os
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+# Rows read and appended at a time, so memory stays bounded however many files are combined
+CHUNK_ROWS = 100_000
+
+def read_header(file_path: str) -> List[str]:
+    """Column names of a CSV file, without reading its rows"""
+    return list(pd.read_csv(file_path, nrows=0).columns)
+
+def combined_columns(headers: List[List[str]], source_column: Optional[str] = None) -> List[str]:
+    """
+    Union of all headers in order of first appearance, the column order pd.concat would produce
+    after adding source_column to every file.
+    """
+    columns = {}
+    for header in headers:
+        for column in header + ([source_column] if source_column else []):
+            columns.setdefault(column, None)
+    return list(columns)
+
+def append_csv_files(sources: List[Tuple[str, Optional[str]]], output_file: str,
+                     source_column: Optional[str] = None, chunk_rows: int = CHUNK_ROWS) -> Tuple[int, int]:
+    """
+    Stream CSV files into one output CSV, chunk by chunk.
+
+    sources lists (path, label) pairs; when source_column is given, every row gets its file's label there.
+    Files missing some columns get empty cells, and cell text is copied as is, never re-typed.
+    Unreadable files are reported and skipped.
+
+    Returns (files combined, rows written).
+    """
+    # A header pass over every file fixes the output columns before the first row is written
+    readable = []
+    headers = []
+    for file_path, label in sources:
+        try:
+            headers.append(read_header(file_path))
+            readable.append((file_path, label))
+        except Exception as e:
+            print(f"Error reading {file_path}: {e}")
+
+    if not readable:
+        return 0, 0
+
+    columns = combined_columns(headers, source_column)
+    output_dir = os.path.dirname(output_file)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    rows = 0
+    pd.DataFrame(columns=columns).to_csv(output_file, index=False)
+    for file_path, label in readable:
+        chunks = pd.read_csv(file_path, dtype=str, keep_default_na=False, na_filter=False, chunksize=chunk_rows)
+        for chunk in chunks:
+            if source_column:
+                chunk[source_column] = label
+            chunk.reindex(columns=columns, fill_value='').to_csv(output_file, mode='a', header=False, index=False)
+            rows += len(chunk)
+
+    return len(readable), rows
@@ -1,19 +1,32 @@
 import pandas as pd
 import os
+import sys
 
-def combine_test_metrics(csv1_path, csv2_path, output_path):
+# Path interning is shared by every stage and lives in the parent folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PathDictionary import PathDictionary, read_csv_interned, suffixed_columns
+
+# Columns of the combined output, in order; columns missing from both inputs are added empty
+COLUMNS_ORDER = [
+    'ProductionFile', 'TestFile',
+    'Prod_Changes', 'Prod_TotalCommits', 'Prod_Insertions', 'Prod_Deletions',
+    'Test_Changes', 'Test_TotalCommits', 'Test_Insertions', 'Test_Deletions',
+    'test_filename', 'File Path',
+    'Assertion Roulette', 'Conditional Test Logic', 'Constructor Initialization',
+    'Duplicate Assertion', 'Empty Test', 'Exception Handling', 'General Fixture',
+    'Lack of Cohesion of Test Cases', 'Magic Number Test', 'Obscure In-Line Setup',
+    'Redundant Assertion', 'Redundant Print', 'Sleepy Test', 'Suboptimal Assert',
+    'Test Maverick', 'Total Smells',
+    'ProdIs_Faulty', 'ProdTotalCommits', 'ProdInsertions', 'ProdDeletions',
+    'ProdFaultCount', 'TestIs_Faulty', 'TestTotalCommits', 'TestInsertions',
+    'TestDeletions', 'TestFaultCount', 'Project'
+]
+
+def merge_interned(df1, df2, paths):
     """
-    Combine two CSVs based on TestFile mapping and create a new combined CSV,
-    ensuring one-to-one mapping between test files
+    One-to-one inner join of two tables whose path columns hold ids of paths, keeping the first
+    row of every test file on each side. Returns the output columns with the paths decoded.
     """
-    # Read both CSVs
-    df1 = pd.read_csv(csv1_path)
-    df2 = pd.read_csv(csv2_path)
-    
-    # Check for duplicate TestFiles in both dataframes
-    duplicates_df1 = df1[df1['TestFile'].duplicated(keep=False)]
-    duplicates_df2 = df2[df2['TestFile'].duplicated(keep=False)]
-    
     # Remove duplicates by keeping the first occurrence
     df1_unique = df1.drop_duplicates(subset=['TestFile'], keep='first')
     df2_unique = df2.drop_duplicates(subset=['TestFile'], keep='first')
@@ -26,30 +39,42 @@ def combine_test_metrics(csv1_path, csv2_path, output_path):
         how='inner',  # Changed to inner join to keep only matching records
         suffixes=('_1', '_2')
     )
-    
-    # Define the desired column order
-    columns_order = [
-        'ProductionFile', 'TestFile',
-        'Prod_Changes', 'Prod_TotalCommits', 'Prod_Insertions', 'Prod_Deletions',
-        'Test_Changes', 'Test_TotalCommits', 'Test_Insertions', 'Test_Deletions',
-        'test_filename', 'File Path',
-        'Assertion Roulette', 'Conditional Test Logic', 'Constructor Initialization',
-        'Duplicate Assertion', 'Empty Test', 'Exception Handling', 'General Fixture',
-        'Lack of Cohesion of Test Cases', 'Magic Number Test', 'Obscure In-Line Setup',
-        'Redundant Assertion', 'Redundant Print', 'Sleepy Test', 'Suboptimal Assert',
-        'Test Maverick', 'Total Smells',
-        'ProdIs_Faulty', 'ProdTotalCommits', 'ProdInsertions', 'ProdDeletions',
-        'ProdFaultCount', 'TestIs_Faulty', 'TestTotalCommits', 'TestInsertions',
-        'TestDeletions', 'TestFaultCount', 'Project'
-    ]
+    path_columns = suffixed_columns(merged_df)
     
     # Ensure all columns exist, create if missing with NaN values
-    for col in columns_order:
+    for col in COLUMNS_ORDER:
         if col not in merged_df.columns:
             merged_df[col] = pd.NA
     
-    # Select and order columns
-    result_df = merged_df[columns_order]
+    # Select and order columns, turning path ids back into text for the output
+    result_df = merged_df[COLUMNS_ORDER].copy()
+    paths.decode_columns(result_df, [col for col in path_columns if col in COLUMNS_ORDER])
+    return result_df
+
+def combine_frames(df1, df2):
+    """Combine TS_CP and fault-proneness tables already in memory; the inputs are left untouched"""
+    paths = PathDictionary()
+    df1 = df1.copy()
+    df2 = df2.copy()
+    paths.encode_columns(df1)
+    paths.encode_columns(df2)
+    return merge_interned(df1, df2, paths)
+
+def combine_test_metrics(csv1_path, csv2_path, output_path):
+    """
+    Combine two CSVs based on TestFile mapping and create a new combined CSV,
+    ensuring one-to-one mapping between test files
+    """
+    # Read both CSVs; path columns become int32 ids from one dictionary, so dedup and join hash integers
+    paths = PathDictionary()
+    df1 = read_csv_interned(csv1_path, paths)
+    df2 = read_csv_interned(csv2_path, paths)
+    
+    # Check for duplicate TestFiles in both dataframes
+    duplicates_df1 = df1[df1['TestFile'].duplicated(keep=False)]
+    duplicates_df2 = df2[df2['TestFile'].duplicated(keep=False)]
+    
+    result_df = merge_interned(df1, df2, paths)
     
     # Save the combined DataFrame
     result_df.to_csv(output_path, index=False)
@@ -57,10 +82,10 @@ def combine_test_metrics(csv1_path, csv2_path, output_path):
     # Print detailed statistics
     print(f"\nDetailed Combination Statistics:")
     print(f"Records in first CSV (TS_CP.csv): {len(df1)}")
-    print(f"Unique test files in first CSV: {len(df1_unique)}")
+    print(f"Unique test files in first CSV: {df1['TestFile'].nunique()}")
     print(f"Duplicate test files in first CSV: {len(duplicates_df1)}")
     print(f"\nRecords in second CSV (combined_results.csv): {len(df2)}")
-    print(f"Unique test files in second CSV: {len(df2_unique)}")
+    print(f"Unique test files in second CSV: {df2['TestFile'].nunique()}")
     print(f"Duplicate test files in second CSV: {len(duplicates_df2)}")
     print(f"\nFinal matched records (1-to-1 mapping): {len(result_df)}")
     print(f"\nOutput saved to: {output_path}")
@@ -68,10 +93,10 @@ def combine_test_metrics(csv1_path, csv2_path, output_path):
     # Print some example duplicates if they exist
     if len(duplicates_df1) > 0:
         print("\nExample duplicate test files in first CSV:")
-        print(duplicates_df1['TestFile'].head())
+        print(paths.decode(duplicates_df1['TestFile'].head()))
     if len(duplicates_df2) > 0:
         print("\nExample duplicate test files in second CSV:")
-        print(duplicates_df2['TestFile'].head())
+        print(paths.decode(duplicates_df2['TestFile'].head()))
 
 def main():
     # Your specific input and output paths
@@ -1,5 +1,9 @@
 import os
-import pandas as pd
+import sys
+
+# The streaming CSV aggregator is shared by every stage and lives in the parent folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from StreamingAggregator import append_csv_files
 
 def combine_csv_files(source_folder, destination_file):
     """
@@ -17,32 +21,16 @@ def combine_csv_files(source_folder, destination_file):
             print(f"No CSV files found in {source_folder}")
             return
             
-        # Create empty list to store dataframes
-        dfs = []
-        
-        # Read each CSV file
+        # Each file is tagged with its name as project column and streamed into the destination
+        sources = []
         for file in csv_files:
             print(f"Processing: {file}")
-            # Read the current CSV
-            df = pd.read_csv(os.path.join(source_folder, file))
-            
-            # Add project name as a column 
-            df['Source_File'] = file.replace('.csv', '')
-            
-            # Append to list of dataframes
-            dfs.append(df)
-        
-        # Concatenate all dataframes
-        merged_df = pd.concat(dfs, ignore_index=True)
-        
-        # Create destination directory if it doesn't exist
-        os.makedirs(os.path.dirname(destination_file), exist_ok=True)
+            sources.append((os.path.join(source_folder, file), file.replace('.csv', '')))
         
-        # Save the merged dataframe
-        merged_df.to_csv(destination_file, index=False)
+        files_combined, rows = append_csv_files(sources, destination_file, source_column='Source_File')
         print(f"\nSuccess! Combined file saved as: {destination_file}")
-        print(f"Total files processed: {len(csv_files)}")
-        print(f"Total rows in combined file: {len(merged_df)}")
+        print(f"Total files processed: {files_combined}")
+        print(f"Total rows in combined file: {rows}")
         
     except Exception as e:
         print(f"An error occurred: {str(e)}")
@@ -0,0 +1,146 @@
+import argparse
+import hashlib
+import inspect
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+# Stage code lives in the parent folder, the CP folder and the smell detection folder next to it
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(parent_dir), 'Test Smells Detection'))
+sys.path.insert(0, os.path.join(parent_dir, 'CP'))
+sys.path.insert(0, parent_dir)
+import CP_Production_TestFile
+import ExtractSmellyFiles
+import FPvsTS_CP
+import PathDictionary
+import RevisedSmellswithCP
+import Single_XmltoCSV
+import SmellDetector
+import SmellsPlusCP
+import SmellsSummary
+import TestFileClassifier
+import UpdateSmellFormate18
+from PipelineRunner import Stage, run_pipeline
+from SmellCache import SmellResultCache, file_sha
+from StageCache import StageCache
+
+# In-memory version of the file-by-file chain
+#   SmellDetector -> SmellsSummary/UpdateSmellFormate18 ─┐
+#   CP_Production_TestFile ──────────────────────────────┴─> SmellsPlusCP -> RevisedSmellswithCP -> TS_CP ─┐
+#   FP combined results ───────────────────────────────────────────────────────────────────────────────────┴─> FPvsTS_CP
+# Each stage hands its DataFrames to the next, one per project up to TS_CP; CSVs are only written for
+# the stages asked for. The smell and CP branches, and the FP branch, run at the same time.
+# With a stage cache, a rerun only recomputes the projects whose test files or change metrics changed.
+
+def code_version(*code):
+    """
+    Version of a stage: a hash of the source of the functions of this file it runs and of the modules they call.
+    Editing one of them invalidates only the cached outputs of the stages listing it; the lambdas in
+    build_stages only bind arguments and are not part of any version.
+    """
+    digest = hashlib.sha1()
+    for part in code:
+        digest.update(inspect.getsource(part).encode())
+    return digest.hexdigest()[:12]
+
+def test_file_fingerprints(projects_dir):
+    """Per project, a hash of the paths and contents of the test files the detector reads"""
+    fingerprints = {}
+    for project in sorted(d for d in os.listdir(projects_dir) if os.path.isdir(os.path.join(projects_dir, d))):
+        digest = hashlib.sha1()
+        for file_path, relative_path, _ in SmellDetector.find_test_files(os.path.join(projects_dir, project), project):
+            digest.update(f"{relative_path}\0{file_sha(file_path)}\0".encode())
+        fingerprints[project] = digest.hexdigest()
+    return fingerprints
+
+def change_metric_fingerprints(cp_dir):
+    """Per project, the content hash of its <project>_analysis.csv"""
+    return {
+        filename[:-len('_analysis.csv')]: file_sha(os.path.join(cp_dir, filename))
+        for filename in sorted(os.listdir(cp_dir)) if filename.endswith('_analysis.csv')
+    }
+
+def detect_smells(project_path, executor=None, cache_path=None):
+    """Smell rows of one project folder, as SmellDetector writes them"""
+    # The SQLite connection belongs to the thread running the stage, so the file cache is opened here
+    cache = SmellResultCache(cache_path, SmellDetector.DETECTOR_VERSION) if cache_path else None
+    try:
+        _, results = SmellDetector.project_rows(project_path, executor, cache)
+        return pd.DataFrame([row for rows in results for row in rows], columns=SmellDetector.COLUMNS)
+    finally:
+        if cache is not None:
+            cache.close()
+
+def read_change_metrics(cp_dir, project):
+    """Test-file CP summary of one project, from its <project>_analysis.csv"""
+    return CP_Production_TestFile.transform_frame(pd.read_csv(os.path.join(cp_dir, f"{project}_analysis.csv")))
+
+def standardize_smells(project, smells):
+    """18-column standardized smell counts per file of one project"""
+    _, _, _, standardized = next(SmellsSummary.summarize_corpus([(project, smells)]))
+    return standardized
+
+def combine_projects(revised):
+    """All projects in one table, each row tagged with its project like TS_CP_FP does"""
+    frames = [df.assign(Source_File=project) for project, df in revised.items()]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+def build_stages(projects_dir, cp_dir, fp_results=None, executor=None, cache_path=None):
+    stages = [
+        Stage('smells', lambda project: detect_smells(os.path.join(projects_dir, project), executor, cache_path),
+              per_project=True, fingerprint=lambda: test_file_fingerprints(projects_dir),
+              version=code_version(detect_smells, SmellDetector, ExtractSmellyFiles, Single_XmltoCSV, TestFileClassifier)),
+        Stage('smell_counts', standardize_smells, ('smells',), per_project=True,
+              version=code_version(standardize_smells, SmellsSummary, UpdateSmellFormate18)),
+        Stage('cp_summary', lambda project: read_change_metrics(cp_dir, project),
+              per_project=True, fingerprint=lambda: change_metric_fingerprints(cp_dir),
+              version=code_version(read_change_metrics, CP_Production_TestFile, TestFileClassifier)),
+        Stage('smells_plus_cp', lambda project, cp_df, smell_df: SmellsPlusCP.merge_cp_with_smells(cp_df, smell_df),
+              ('cp_summary', 'smell_counts'), per_project=True,
+              version=code_version(SmellsPlusCP, PathDictionary)),
+        Stage('revised', lambda project, df: RevisedSmellswithCP.keep_exact_matches(df), ('smells_plus_cp',),
+              per_project=True, version=code_version(RevisedSmellswithCP)),
+        Stage('ts_cp', combine_projects, ('revised',), version=code_version(combine_projects)),
+    ]
+    if fp_results:
+        stages += [
+            Stage('fp_results', lambda: pd.read_csv(fp_results), fingerprint=lambda: file_sha(fp_results),
+                  version=code_version()),
+            Stage('final', FPvsTS_CP.combine_frames, ('ts_cp', 'fp_results'),
+                  version=code_version(FPvsTS_CP, PathDictionary)),
+        ]
+    return stages
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run the smell, CP and FP stages in memory, writing only the tables asked for')
+    parser.add_argument('--projects_dir', default=".../Smells_Dataset", help='Folder holding one folder per project')
+    parser.add_argument('--cp_dir', default=".../ChangeProneness_analysis_results",
+                        help='Folder with the <project>_analysis.csv change metrics')
+    parser.add_argument('--fp_results', help='combined_results.csv of the FP scripts; without it the pipeline stops at ts_cp')
+    parser.add_argument('--output_dir', default=".../SM_CP_FP", help='Folder receiving the materialized stages')
+    parser.add_argument('--materialize', nargs='*',
+                        help='Stages written as CSV, by default only the last one; dict stages get one file per project')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processes scanning test files in parallel, 1 scans sequentially')
+    parser.add_argument('--cache', help='SQLite file keeping per-file smell results, so reruns only analyze changed files')
+    parser.add_argument('--stage_cache',
+                        help='Folder keeping stage outputs by content, so reruns only recompute stages and projects whose inputs changed')
+    args = parser.parse_args()
+
+    # Worker processes only start once a project's test files actually need scanning
+    executor = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 1 else None
+    stage_cache = StageCache(args.stage_cache) if args.stage_cache else None
+    stages = build_stages(args.projects_dir, args.cp_dir, args.fp_results, executor, args.cache)
+    materialize = args.materialize if args.materialize is not None else [stages[-1].name]
+    try:
+        run_pipeline(stages, output_dir=args.output_dir, materialize=materialize, cache=stage_cache)
+    except Exception as e:
+        print(f"Error occurred: {str(e)}")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if stage_cache is not None:
+            stage_cache.close()
@@ -0,0 +1,41 @@
+import re
+import pandas as pd
+
+# Single definition of a test file, shared by every pipeline stage.
+# A path is a test file when, ignoring case:
+#   - one of its directories is test, tests, unittest, unittests, spec or specs
+#   - its file name starts with test_ or tests_
+#   - its file name ends with _test or _tests before the extension
+TEST_PATH_PATTERN = (
+    r'(?:^|/)(?:unit)?tests?/'
+    r'|(?:^|/)specs?/'
+    r'|(?:^|/)tests?_[^/]*$'
+    r'|_tests?\.[^/]*$'
+)
+TEST_PATH_REGEX = re.compile(TEST_PATH_PATTERN, re.IGNORECASE)
+
+def normalize_path(path: str) -> str:
+    """Use forward slashes so Windows paths classify the same way"""
+    return str(path).replace('\\', '/')
+
+def is_test_file(path) -> bool:
+    """Classify a single path"""
+    if not isinstance(path, str):
+        return False
+    path = path.lower()
+    # Every rule needs 'test' or 'spec' somewhere, a substring check skips the regex for most files
+    if 'test' not in path and 'spec' not in path:
+        return False
+    return TEST_PATH_REGEX.search(normalize_path(path)) is not None
+
+def classify_test_paths(paths: pd.Series) -> pd.Series:
+    """Classify a whole column of paths at once, returning a boolean Series"""
+    try:
+        paths = paths.astype('string[pyarrow]')
+    except ImportError:
+        # Without pyarrow a loop over the compiled regex beats pandas' object-dtype string methods
+        return pd.Series([is_test_file(path) for path in paths], index=paths.index, dtype=bool)
+
+    # Arrow runs the replace and the alternation regex as native kernels over the whole column
+    paths = paths.str.replace('\\', '/', regex=False)
+    return paths.str.contains(TEST_PATH_PATTERN, case=False, regex=True, na=False).astype(bool)
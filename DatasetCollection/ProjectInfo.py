@@ -1,6 +1,11 @@
 import os
+import sys
 import ast
 
+# The test-file classifier shared by every pipeline stage lives with the CP/FP scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Change Proneness_FaultProneness'))
+from TestFileClassifier import is_test_file
+
 def count_loc(file_path):
     """
     Count lines of code (LOC) in a Python test file.
@@ -53,12 +58,6 @@ def count_classes_and_methods(file_path):
         print(f"Skipping file {file_path} due to {type(e).__name__}: {e}")
         return 0, 0
 
-def is_test_file(file_name):
-    """
-    Check if the file is a test file based on common test file naming conventions.
-    """
-    return file_name.startswith('test_') or file_name.endswith('_test.py')
-
 def calculate_test_metrics(project_path):
     """
     Traverse the project directory and calculate metrics for test files only.
@@ -70,9 +69,10 @@ def calculate_test_metrics(project_path):
 
     for root, _, files in os.walk(project_path):
         for file in files:
-            if file.endswith('.py') and is_test_file(file):
+            file_path = os.path.join(root, file)
+            # Classify on the path inside the project so test folders count too
+            if file.endswith('.py') and is_test_file(os.path.relpath(file_path, project_path)):
                 total_test_files += 1
-                file_path = os.path.join(root, file)
                
                 # Count LOC for the test file
                 test_loc = count_loc(file_path)
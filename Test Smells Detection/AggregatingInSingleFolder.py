@@ -1,5 +1,32 @@
 import os
-import pandas as pd
+import sys
+
+# The streaming CSV aggregator lives with the CP/FP scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Change Proneness_FaultProneness'))
+from StreamingAggregator import append_csv_files
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # Only needed when the converter wrote Parquet files
+    pq = None
+
+def aggregate_parquet_files(project_folder, parquet_files, output_dir):
+    """
+    Append the typed tables of one project into a single Parquet file, one report at a time.
+    """
+    output_path = os.path.join(output_dir, f"{project_folder}_aggregated.parquet")
+    writer = None
+    try:
+        for file_path in parquet_files:
+            table = pq.read_table(file_path)
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    
+    print(f"Aggregated {len(parquet_files)} files for {project_folder}")
 
 def aggregate_csv_files(input_dir, output_dir):
     os.makedirs(output_dir, exist_ok=True)
@@ -11,25 +38,25 @@ def aggregate_csv_files(input_dir, output_dir):
         if not os.path.isdir(project_path):
             continue
         
-        # List to hold dataframes for this project
-        dfs = []
-        
-        # Read all CSV files in the project folder
-        for csv_file in os.listdir(project_path):
-            if csv_file.endswith('.csv'):
-                file_path = os.path.join(project_path, csv_file)
-                df = pd.read_csv(file_path)
-                dfs.append(df)
+        # Reports converted to Parquet are appended as typed tables, without a round trip through pandas
+        parquet_files = [
+            os.path.join(project_path, f) for f in os.listdir(project_path) if f.endswith('.parquet')
+        ]
+        if parquet_files:
+            if pq is None:
+                print(f"Skipping Parquet files of {project_folder}, pyarrow is not installed")
+            else:
+                aggregate_parquet_files(project_folder, parquet_files, output_dir)
         
-        # Combine project dataframes
-        if dfs:
-            combined_df = pd.concat(dfs, ignore_index=True)
-            
-            # Save project-specific aggregated CSV
+        # Stream all CSV files in the project folder into the project-specific aggregated CSV
+        csv_files = [
+            (os.path.join(project_path, f), None) for f in os.listdir(project_path) if f.endswith('.csv')
+        ]
+        if csv_files:
             output_path = os.path.join(output_dir, f"{project_folder}_aggregated.csv")
-            combined_df.to_csv(output_path, index=False)
+            files_combined, _ = append_csv_files(csv_files, output_path)
             
-            print(f"Aggregated {len(dfs)} files for {project_folder}")
+            print(f"Aggregated {files_combined} files for {project_folder}")
 
 # Paths
 input_dir = '/home/siam/Desktop/volume1/MS_Papers_Arif/Data/XMLtoCSV'
@@ -1,36 +1,96 @@
 import os
+import re
+import csv
 import shutil
+import argparse
 from pathlib import Path
 import sys
 
-def find_test_smell_files(source_dir, dest_base_dir):
+TEST_SMELLS = [
+    "AssertionRoulette",
+    "ConditionalTestLogic",
+    "ConstructorInitialization",
+    "DefaultTest",
+    "DuplicateAssertion",
+    "EmptyTest",
+    "ExceptionHandling",
+    "GeneralFixture",
+    "IgnoredTest",
+    "LackOfCohesionOfTestCases",
+    "MagicNumberTest",
+    "ObscureInLineSetup",
+    "RedundantAssertion",
+    "RedundantPrint",
+    "SleepyTest",
+    "SuboptimalAssert",
+    "TestMaverick",
+    "UnknownTest"
+]
+
+# All 18 smell names as one alternation, checked with a single search per file name
+SMELL_PATTERN = re.compile('|'.join(re.escape(smell) for smell in TEST_SMELLS))
+
+# Folders that never hold smell reports: VCS metadata, caches and installed packages
+SKIPPED_DIRS = {'.git', '.hg', '.svn', '__pycache__', 'node_modules', 'site-packages',
+                '.tox', '.nox', '.mypy_cache', '.pytest_cache', '.idea'}
+
+# In manifest mode each project folder lists its smell files here instead of holding copies
+MANIFEST_NAME = 'smell_manifest.csv'
+
+# How a matched file is placed in the project folder, and the verb used in the log
+MODES = {'copy': 'Copied', 'hardlink': 'Linked', 'manifest': 'Listed'}
+
+def iter_project_files(source_dir):
+    """
+    Walk a project tree, pruning skipped folders and virtualenvs (any folder holding a pyvenv.cfg).
+    """
+    for root, dirs, files in os.walk(source_dir):
+        dirs[:] = [
+            d for d in dirs
+            if d not in SKIPPED_DIRS and not os.path.exists(os.path.join(root, d, 'pyvenv.cfg'))
+        ]
+        yield root, files
+
+def link_or_copy(source_file, dest_file):
+    """
+    Hardlink source_file to dest_file, copying instead when both are not on the same file system.
+    """
+    if os.path.lexists(dest_file):
+        os.remove(dest_file)
+    try:
+        os.link(source_file, dest_file)
+    except OSError:
+        shutil.copy2(source_file, dest_file)
+
+def write_manifest(dest_dir, entries):
+    """
+    Record the smell files of a project as (file, source) rows in its manifest.
+    """
+    with open(os.path.join(dest_dir, MANIFEST_NAME), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['file', 'source'])
+        writer.writerows(sorted(entries.items()))
+
+def read_manifest(folder):
     """
-    Find and copy test smell files from a project directory to its corresponding destination folder.
+    Smell files listed in a folder's manifest, as a dict of file name to source path; empty without a manifest.
+    """
+    manifest_path = os.path.join(folder, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, newline='', encoding='utf-8') as f:
+        return {row['file']: row['source'] for row in csv.DictReader(f)}
+
+def find_test_smell_files(source_dir, dest_base_dir, mode='copy'):
+    """
+    Find test smell files in a project directory and place them in its corresponding destination folder.
     
     Args:
         source_dir (str): Source project directory path
         dest_base_dir (str): Base destination directory where project folders will be created
+        mode (str): 'copy' copies the files, 'hardlink' links them, 'manifest' only lists them in a manifest
     """
-    test_smells = [
-        "AssertionRoulette",
-        "ConditionalTestLogic",
-        "ConstructorInitialization",
-        "DefaultTest",
-        "DuplicateAssertion",
-        "EmptyTest",
-        "ExceptionHandling",
-        "GeneralFixture",
-        "IgnoredTest",
-        "LackOfCohesionOfTestCases",
-        "MagicNumberTest",
-        "ObscureInLineSetup",
-        "RedundantAssertion",
-        "RedundantPrint",
-        "SleepyTest",
-        "SuboptimalAssert",
-        "TestMaverick",
-        "UnknownTest"
-    ]
+    verb = MODES[mode]
     
     try:
         project_name = os.path.basename(os.path.normpath(source_dir))
@@ -38,18 +98,25 @@ def find_test_smell_files(source_dir, dest_base_dir):
         os.makedirs(dest_dir, exist_ok=True)
         
         found_files = 0
+        manifest_entries = {}
         
-        for root, _, files in os.walk(source_dir):
+        for root, files in iter_project_files(source_dir):
             for file in files:
-                if any(smell in file for smell in test_smells):
+                if SMELL_PATTERN.search(file):
                     try:
                         source_file = os.path.join(root, file)
                         dest_file = os.path.join(dest_dir, file)
                         
                         if os.path.abspath(source_file) != os.path.abspath(dest_file):
-                            shutil.copy2(source_file, dest_file)
+                            if mode == 'manifest':
+                                # Like copies into one flat folder, a later file with the same name wins
+                                manifest_entries[file] = os.path.abspath(source_file)
+                            elif mode == 'hardlink':
+                                link_or_copy(source_file, dest_file)
+                            else:
+                                shutil.copy2(source_file, dest_file)
                             found_files += 1
-                            print(f"Copied: {file} -> {project_name}")
+                            print(f"{verb}: {file} -> {project_name}")
                     except shutil.SameFileError:
                         print(f"Warning: Skipping {file} as it's the same file")
                     except PermissionError:
@@ -57,10 +124,16 @@ def find_test_smell_files(source_dir, dest_base_dir):
                     except Exception as e:
                         print(f"Error copying {file}: {str(e)}")
         
+        if mode == 'manifest':
+            write_manifest(dest_dir, manifest_entries)
+        
         if found_files > 0:
             print(f"\nProject: {project_name}")
-            print(f"Total files found and copied: {found_files}")
-            print(f"Files have been copied to: {dest_dir}")
+            print(f"Total files found and {verb.lower()}: {found_files}")
+            if mode == 'manifest':
+                print(f"Manifest written to: {os.path.join(dest_dir, MANIFEST_NAME)}")
+            else:
+                print(f"Files have been {verb.lower()} to: {dest_dir}")
             print("-" * 50)
         return found_files
     
@@ -68,13 +141,14 @@ def find_test_smell_files(source_dir, dest_base_dir):
         print(f"Error processing project {os.path.basename(source_dir)}: {str(e)}")
         return 0
 
-def process_multiple_projects(base_source_dir, base_dest_dir):
+def process_multiple_projects(base_source_dir, base_dest_dir, mode='copy'):
     """
     Process multiple projects in the source directory.
     
     Args:
         base_source_dir (str): Base directory containing all project folders
         base_dest_dir (str): Base directory where test smell files will be organized
+        mode (str): How smell files are placed, see find_test_smell_files
     """
     try:
         os.makedirs(base_dest_dir, exist_ok=True)
@@ -93,7 +167,7 @@ def process_multiple_projects(base_source_dir, base_dest_dir):
         for project in project_dirs:
             try:
                 source_dir = os.path.join(base_source_dir, project)
-                files_found = find_test_smell_files(source_dir, base_dest_dir)
+                files_found = find_test_smell_files(source_dir, base_dest_dir, mode)
                 total_files += files_found
                 if files_found > 0:
                     processed_projects += 1
@@ -111,10 +185,15 @@ def process_multiple_projects(base_source_dir, base_dest_dir):
         sys.exit(1)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Collect the test smell reports of every project into one tree')
     # Base directory containing all projects
-    base_source_directory = "/home/iit/Downloads/Thesis/Smells_Dataset"
-    
+    parser.add_argument('--source_dir', default="/home/iit/Downloads/Thesis/Smells_Dataset",
+                        help='Folder holding one folder per project')
     # Updated destination directory path
-    base_destination_directory = "/home/iit/Downloads/Thesis/TEST_SMELL_EXTRACT"
+    parser.add_argument('--dest_dir', default="/home/iit/Downloads/Thesis/TEST_SMELL_EXTRACT",
+                        help='Folder receiving one folder per project')
+    parser.add_argument('--mode', choices=sorted(MODES), default='copy',
+                        help='copy the files, hardlink them, or only list them in a per-project manifest')
+    args = parser.parse_args()
     
-    process_multiple_projects(base_source_directory, base_destination_directory)
\ No newline at end of file
+    process_multiple_projects(args.source_dir, args.dest_dir, args.mode)
\ No newline at end of file
@@ -1,63 +1,112 @@
 import os
-import xml.etree.ElementTree as ET
 import csv
+import argparse
 
-def convert_xml_to_csv(input_dir, output_dir):
+# Streaming report parser and atomic writers shared with the whole-tree converter
+from ExtractSmellyFiles import read_manifest
+from ProblemParser import ProblemField, ProblemParser, iter_problems
+from XmltoCsv import integer_values, write_atomically, write_parquet
+
+try:
+    import pyarrow as pa
+except ImportError:  # Parquet output is optional, CSV needs nothing beyond the standard library
+    pa = None
+
+# Columns of the per-project CSV; 'N/A' marks a tag or attribute missing from the report
+PROJECT_PARSER = ProblemParser([
+    ProblemField('Module', 'module', default='N/A'),
+    ProblemField('File Path', 'file', default='N/A'),
+    ProblemField('Line', 'line', default='N/A'),
+    ProblemField('File Name', 'problem_class', attribute='id', default='N/A'),
+    ProblemField('Test Smell', 'problem_class', default='N/A'),
+    ProblemField('Severity', 'problem_class', attribute='severity', default='N/A'),
+    ProblemField('Description', 'description', default='N/A'),
+    ProblemField('Highlighted Element', 'highlighted_element', default='N/A'),
+    ProblemField('Language', 'language', default='N/A'),
+    ProblemField('Offset', 'offset', default='N/A'),
+    ProblemField('Length', 'length', default='N/A'),
+])
+
+def parquet_schema():
+    """
+    Typed layout of a per-project report: positions are integers, missing values are nulls,
+    and the few distinct project, module, smell, severity and language names are dictionary-encoded,
+    so SmellsSummary reads the 'Test Smell' column as a categorical straight away.
+    """
+    category = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('Project Name', category),
+        ('Module', category),
+        ('File Path', pa.string()),
+        ('Line', pa.int32()),
+        ('File Name', category),
+        ('Test Smell', category),
+        ('Severity', category),
+        ('Description', pa.string()),
+        ('Highlighted Element', pa.string()),
+        ('Language', category),
+        ('Offset', pa.int64()),
+        ('Length', pa.int32()),
+    ])
+
+def typed_report_rows(file_path, project_name):
+    """
+    Typed rows of one report for the Parquet output. The 'N/A' defaults become nulls, which is
+    what pandas reads them back as from the CSV files, so both formats summarize the same.
+    """
+    for problem in iter_problems(file_path):
+        row = {name: None if value == 'N/A' else value for name, value in PROJECT_PARSER.parse(problem).items()}
+        row = integer_values(row, ('Line', 'Offset', 'Length'))
+        row['Project Name'] = project_name
+        yield row
+
+def convert_xml_to_csv(input_dir, output_dir, output_format='csv'):
+    """
+    Convert every report of one project folder, as CSV or, with output_format 'parquet', as typed Parquet files.
+    """
+    if output_format == 'parquet' and pa is None:
+        print("Parquet output needs pyarrow, install it or use the csv format")
+        return
     os.makedirs(output_dir, exist_ok=True)
+    project_name = os.path.basename(input_dir)
     
-    for filename in os.listdir(input_dir):
+    # Reports stored in the folder, plus those its smell manifest points to
+    xml_sources = {f: os.path.join(input_dir, f) for f in os.listdir(input_dir) if f.endswith('.xml')}
+    for filename, source in read_manifest(input_dir).items():
         if filename.endswith('.xml'):
-            file_path = os.path.join(input_dir, filename)
+            xml_sources.setdefault(filename, source)
+    
+    for filename, file_path in xml_sources.items():
+        try:
+            output_filename = os.path.splitext(filename)[0] + f'.{output_format}'
+            output_path = os.path.join(output_dir, output_filename)
             
-            try:
-                tree = ET.parse(file_path)
-                root = tree.getroot()
-                
-                output_csv_filename = os.path.splitext(filename)[0] + '.csv'
-                output_csv_path = os.path.join(output_dir, output_csv_filename)
-                
-                with open(output_csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-                    fieldnames = [
-                        'Project Name', 
-                        'Module', 
-                        'File Path', 
-                        'Line',
-                        'File Name', 
-                        'Test Smell', 
-                        'Severity', 
-                        'Description', 
-                        'Highlighted Element', 
-                        'Language', 
-                        'Offset', 
-                        'Length'
-                    ]
+            if output_format == 'parquet':
+                write_parquet(output_path, parquet_schema(), typed_report_rows(file_path, project_name))
+            else:
+                def write_rows(csvfile):
+                    fieldnames = ['Project Name'] + PROJECT_PARSER.columns
                     writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
                     writer.writeheader()
                     
-                    for problem in root.findall('.//problem'):
-                        writer.writerow({
-                            'Project Name': os.path.basename(input_dir),
-                            'Module': problem.find('module').text if problem.find('module') is not None else 'N/A',
-                            'File Path': problem.find('file').text if problem.find('file') is not None else 'N/A',
-                            'Line': problem.find('line').text if problem.find('line') is not None else 'N/A',
-                            'File Name': problem.find('problem_class').get('id', 'N/A') if problem.find('problem_class') is not None else 'N/A',
-                            'Test Smell': problem.find('problem_class').text if problem.find('problem_class') is not None else 'N/A',
-                            'Severity': problem.find('problem_class').get('severity', 'N/A') if problem.find('problem_class') is not None else 'N/A',
-                            'Description': problem.find('description').text if problem.find('description') is not None else 'N/A',
-                            'Highlighted Element': problem.find('highlighted_element').text if problem.find('highlighted_element') is not None else 'N/A',
-                            'Language': problem.find('language').text if problem.find('language') is not None else 'N/A',
-                            'Offset': problem.find('offset').text if problem.find('offset') is not None else 'N/A',
-                            'Length': problem.find('length').text if problem.find('length') is not None else 'N/A'
-                        })
+                    for problem in iter_problems(file_path):
+                        row = PROJECT_PARSER.parse(problem)
+                        row['Project Name'] = project_name
+                        writer.writerow(row)
                 
-                print(f"Converted {filename} to {output_csv_filename}")
-            
-            except Exception as e:
-                print(f"Error processing {filename}: {e}")
+                write_atomically(output_path, write_rows)
+            print(f"Converted {filename} to {output_filename}")
+        
+        except Exception as e:
+            print(f"Error processing {filename}: {e}")
 
-# Paths
-input_dir = '.../aerospike-client-python'
-output_dir = '.../aerospike-client-python_csv'
-
-# Run conversion
-convert_xml_to_csv(input_dir, output_dir)
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert one project's inspection XML reports to CSV or Parquet")
+    parser.add_argument('--input_dir', default='.../aerospike-client-python', help='Folder holding the XML reports')
+    parser.add_argument('--output_dir', default='.../aerospike-client-python_csv', help='Folder for the converted files')
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv',
+                        help='Output format, parquet writes typed columnar files SmellsSummary reads column by column')
+    args = parser.parse_args()
+    
+    # Run conversion
+    convert_xml_to_csv(args.input_dir, args.output_dir, args.format)
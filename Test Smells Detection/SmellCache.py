@@ -0,0 +1,32 @@
+import hashlib
+import os
+import sys
+from typing import Optional
+
+# The key-value memo behind the cache is shared with the FP scripts in the folder next to this one
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Change Proneness_FaultProneness'))
+from MemoCache import MemoCache
+
+def blob_sha(data: bytes) -> str:
+    """SHA-1 git gives the file content as a blob, so hashes match `git hash-object` and ls-tree output"""
+    return hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()
+
+def file_sha(path: str) -> str:
+    with open(path, 'rb') as f:
+        return blob_sha(f.read())
+
+def source_version(*paths: str) -> str:
+    """
+    Version of the code that produced a result: a hash of its source files,
+    so any edit to the detector or converter invalidates earlier entries.
+    """
+    digest = hashlib.sha1()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+# Content-hash keyed store of per-file smell results, persisted to SQLite when a path is given
+class SmellResultCache(MemoCache):
+    def __init__(self, db_path: Optional[str] = None, version: str = ''):
+        super().__init__(db_path, version, table='results')
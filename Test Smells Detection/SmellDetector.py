@@ -0,0 +1,505 @@
+import argparse
+import ast
+import csv
+import io
+import json
+import math
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+from ExtractSmellyFiles import TEST_SMELLS, iter_project_files
+from Single_XmltoCSV import PROJECT_PARSER
+from SmellCache import SmellResultCache, blob_sha, source_version
+from XmltoCsv import write_atomically
+
+# The test-file classifier shared by every pipeline stage lives with the CP/FP scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Change Proneness_FaultProneness'))
+from TestFileClassifier import is_test_file
+
+# In-process replacement for the IDE inspection run: finds the 18 smells of ExtractSmellyFiles.TEST_SMELLS
+# in unittest test classes with the ast module and writes the columns Single_XmltoCSV produces.
+# Method-level smells are reported once per test method, class-level smells once per test class.
+
+COLUMNS = ['Project Name'] + PROJECT_PARSER.columns
+# Columns that depend on where a file sits rather than on its content, left out of cached results
+LOCATION_COLUMNS = ['Project Name', 'Module', 'File Path']
+# Cached results from any other revision of this file are ignored
+DETECTOR_VERSION = source_version(os.path.abspath(__file__))
+
+# Names written to the 'Test Smell' column, spelled like the inspection reports where UpdateSmellFormate18 knows them
+SMELL_NAMES = {
+    'AssertionRoulette': 'Assertion Roulette',
+    'ConditionalTestLogic': 'Conditional logic test',
+    'ConstructorInitialization': 'Constructor Initialization',
+    'DefaultTest': 'Default Test',
+    'DuplicateAssertion': 'Duplicate assertion test',
+    'EmptyTest': 'Empty Test',
+    'ExceptionHandling': 'Exception handling test',
+    'GeneralFixture': 'General Fixture',
+    'IgnoredTest': 'Ignored Test',
+    'LackOfCohesionOfTestCases': 'Lack of Cohesion of Test Cases',
+    'MagicNumberTest': 'Magic number test',
+    'ObscureInLineSetup': 'Obscure in line setup test',
+    'RedundantAssertion': 'Redundant assertion test',
+    'RedundantPrint': 'Redundant print test',
+    'SleepyTest': 'Sleepy test',
+    'SuboptimalAssert': 'Suboptimal Assert',
+    'TestMaverick': 'Test Maverick',
+    'UnknownTest': 'Unknown Test',
+}
+assert set(SMELL_NAMES) == set(TEST_SMELLS)
+
+DESCRIPTIONS = {
+    'AssertionRoulette': 'Test has several assertions without an explanation message',
+    'ConditionalTestLogic': 'Test contains conditional or loop statements',
+    'ConstructorInitialization': 'Test class initializes fixtures in a constructor instead of setUp',
+    'DefaultTest': 'Test class keeps the default name given by the IDE',
+    'DuplicateAssertion': 'Test repeats the same assertion',
+    'EmptyTest': 'Test has no executable statements',
+    'ExceptionHandling': 'Test handles or raises exceptions itself',
+    'GeneralFixture': 'Not every test uses every field set up by the fixture',
+    'IgnoredTest': 'Test is skipped',
+    'LackOfCohesionOfTestCases': 'Tests of the class share little code',
+    'MagicNumberTest': 'Assertion uses a numeric literal',
+    'ObscureInLineSetup': 'Test sets up too many local variables',
+    'RedundantAssertion': 'Assertion is always true or always false',
+    'RedundantPrint': 'Test prints output',
+    'SleepyTest': 'Test sleeps',
+    'SuboptimalAssert': 'A more specific assertion method fits this check',
+    'TestMaverick': 'Test uses none of the fields set up by the fixture',
+    'UnknownTest': 'Test has no assertion',
+}
+
+SEVERITY = 'WEAK WARNING'
+PROJECT_DIR_PREFIX = 'file://$PROJECT_DIR$/'
+
+# More distinct local variables than this in one test is an obscure in-line setup
+OBSCURE_SETUP_VARIABLES = 10
+# Mean cosine similarity between the tests of a class below which the class lacks cohesion
+COHESION_THRESHOLD = 0.4
+
+# Assertion methods taking one checked argument; the rest take two, a message comes after them
+UNARY_ASSERTS = {'assertTrue', 'assertFalse', 'assertIsNone', 'assertIsNotNone', 'assert_', 'failUnless', 'failIf'}
+ASSERT_ARITY = {'assertAlmostEqual': 3, 'assertNotAlmostEqual': 3, 'fail': 0}
+# Assertions used as context managers, which take no message
+CONTEXT_ASSERTS = {'assertRaises', 'assertRaisesRegex', 'assertRaisesRegexp', 'assertWarns', 'assertWarnsRegex',
+                   'assertLogs', 'assertNoLogs'}
+EQUALITY_ASSERTS = {'assertEqual', 'assertEquals', 'assertNotEqual', 'assertNotEquals', 'assertIs', 'assertIsNot'}
+DEFAULT_TEST_CLASS_NAMES = {'MyTestCase'}
+FIXTURE_METHODS = {'setUp', 'setUpClass', 'asyncSetUp'}
+CONDITIONAL_NODES = {ast.If, ast.For, ast.AsyncFor, ast.While}
+EXCEPTION_NODES = {ast.Try, ast.Raise} | ({ast.TryStar} if hasattr(ast, 'TryStar') else set())
+
+def base_name(node):
+    """Last dotted component of a Name or Attribute, '' for anything else"""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return ''
+
+def assertion_method(node):
+    """Name of the self.assert*/self.fail* method a call uses, or None"""
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+            and isinstance(node.func.value, ast.Name) and node.func.value.id == 'self'
+            and node.func.attr.startswith(('assert', 'fail'))):
+        return node.func.attr
+    return None
+
+def checked_arguments(assertion):
+    """Expressions an assertion checks"""
+    if isinstance(assertion, ast.Assert):
+        return [assertion.test]
+    name = assertion_method(assertion)
+    arity = 1 if name in UNARY_ASSERTS else ASSERT_ARITY.get(name, 2)
+    return assertion.args[:arity]
+
+def has_message(assertion):
+    if isinstance(assertion, ast.Assert):
+        return assertion.msg is not None
+    name = assertion_method(assertion)
+    if name in CONTEXT_ASSERTS:
+        return True
+    arity = 1 if name in UNARY_ASSERTS else ASSERT_ARITY.get(name, 2)
+    return len(assertion.args) > arity or any(keyword.arg == 'msg' for keyword in assertion.keywords)
+
+def is_number(node):
+    return isinstance(node, ast.Constant) and isinstance(node.value, (int, float, complex)) and not isinstance(node.value, bool)
+
+def is_redundant(assertion):
+    """Assertions whose outcome does not depend on the code under test"""
+    arguments = checked_arguments(assertion)
+    if not arguments:
+        return False
+    if len(arguments) == 1:
+        test = arguments[0]
+        if isinstance(test, ast.Constant):
+            return True
+        return (isinstance(test, ast.Compare) and len(test.comparators) == 1
+                and ast.dump(test.left) == ast.dump(test.comparators[0]))
+    return ast.dump(arguments[0]) == ast.dump(arguments[1])
+
+def is_suboptimal(assertion):
+    """Checks a more specific unittest assertion expresses directly, e.g. assertTrue(a == b)"""
+    name = assertion_method(assertion)
+    if name in ('assertTrue', 'assertFalse') and assertion.args:
+        return isinstance(assertion.args[0], ast.Compare)
+    if name in EQUALITY_ASSERTS:
+        return any(isinstance(arg, ast.Constant) and arg.value in (True, False, None) and not is_number(arg)
+                   for arg in assertion.args[:2])
+    return False
+
+def is_empty(method):
+    """Only a docstring, pass or ... in the body"""
+    for statement in method.body:
+        if isinstance(statement, ast.Pass):
+            continue
+        if isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Constant):
+            continue
+        return False
+    return True
+
+def used_fields(method, owner='self'):
+    """Attributes read or written through self (or cls) in a method"""
+    return {
+        node.attr for node in ast.walk(method)
+        if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id == owner
+    }
+
+def fixture_fields(test_class):
+    fields = set()
+    for node in test_class.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name in FIXTURE_METHODS:
+            fields |= used_fields(node, 'cls' if node.name == 'setUpClass' else 'self')
+    return fields
+
+class MethodScan:
+    """
+    Everything the checks need from one test method, gathered in a single walk over its tree
+    instead of one ast.walk per smell.
+    """
+    def __init__(self, method):
+        self.method = method
+        self.assertions = []
+        self.node_types = set()
+        self.called_names = set()       # f() calls
+        self.called_attributes = set()  # x.f() calls
+        self.local_variables = set()
+        self.fields = set()             # self.<field> reads and writes
+        self.tokens = Counter()         # identifiers, the vector compared when measuring cohesion
+
+        stack = [method]
+        while stack:
+            node = stack.pop()
+            node_type = type(node)
+            self.node_types.add(node_type)
+
+            if node_type is ast.Name:
+                if type(node.ctx) is ast.Store:
+                    self.local_variables.add(node.id)
+                if node.id != 'self':
+                    self.tokens[node.id] += 1
+                continue
+            if node_type is ast.Attribute:
+                if type(node.value) is ast.Name and node.value.id == 'self':
+                    self.fields.add(node.attr)
+                if not node.attr.startswith(('assert', 'fail')):
+                    self.tokens[node.attr] += 1
+            elif node_type is ast.Call:
+                if assertion_method(node):
+                    self.assertions.append(node)
+                if type(node.func) is ast.Name:
+                    self.called_names.add(node.func.id)
+                elif type(node.func) is ast.Attribute:
+                    self.called_attributes.add(node.func.attr)
+            elif node_type is ast.Assert:
+                self.assertions.append(node)
+
+            for field in node._fields:
+                value = getattr(node, field, None)
+                if type(value) is list:
+                    stack.extend(item for item in value if isinstance(item, ast.AST))
+                elif isinstance(value, ast.AST) and not isinstance(value, ast.expr_context):
+                    stack.append(value)
+
+def cosine_similarity(a, b):
+    dot = sum(count * b[token] for token, count in a.items() if token in b)
+    norm = math.sqrt(sum(v * v for v in a.values())) * math.sqrt(sum(v * v for v in b.values()))
+    return dot / norm if norm else 0.0
+
+def is_test_class(node):
+    return isinstance(node, ast.ClassDef) and any(base_name(base).endswith('TestCase') for base in node.bases)
+
+def iter_test_classes(statements):
+    """
+    Test classes among statements, looking into nested classes and if/try blocks
+    but not into function bodies, where test classes are not declared.
+    """
+    for node in statements:
+        if is_test_class(node):
+            yield node
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        for field in ('body', 'orelse', 'finalbody'):
+            yield from iter_test_classes(getattr(node, field, []))
+        for handler in getattr(node, 'handlers', []):
+            yield from iter_test_classes(handler.body)
+
+def has_duplicates(assertions):
+    """Whether two assertions are identical; only those calling the same method the same way get compared"""
+    groups = {}
+    for assertion in assertions:
+        key = (assertion_method(assertion), len(getattr(assertion, 'args', ())))
+        groups.setdefault(key, []).append(assertion)
+    for group in groups.values():
+        if len(group) > 1:
+            dumps = [ast.dump(assertion) for assertion in group]
+            if len(set(dumps)) < len(dumps):
+                return True
+    return False
+
+def is_skipped(node):
+    for decorator in node.decorator_list:
+        target = decorator.func if isinstance(decorator, ast.Call) else decorator
+        if 'skip' in base_name(target).lower():
+            return True
+    return False
+
+def method_smells(scan, fields, class_skipped):
+    """Keys of the smells a single test method has"""
+    smells = set()
+    method = scan.method
+    assertions = scan.assertions
+
+    if is_empty(method):
+        smells.add('EmptyTest')
+    elif not assertions:
+        smells.add('UnknownTest')
+
+    if sum(not has_message(assertion) for assertion in assertions) > 1:
+        smells.add('AssertionRoulette')
+    if has_duplicates(assertions):
+        smells.add('DuplicateAssertion')
+    if any(is_number(node) for assertion in assertions for arg in checked_arguments(assertion) for node in ast.walk(arg)):
+        smells.add('MagicNumberTest')
+    if any(is_redundant(assertion) for assertion in assertions):
+        smells.add('RedundantAssertion')
+    if any(is_suboptimal(assertion) for assertion in assertions):
+        smells.add('SuboptimalAssert')
+
+    if scan.node_types & CONDITIONAL_NODES:
+        smells.add('ConditionalTestLogic')
+    if scan.node_types & EXCEPTION_NODES:
+        smells.add('ExceptionHandling')
+    if 'print' in scan.called_names:
+        smells.add('RedundantPrint')
+    if 'sleep' in scan.called_names or 'sleep' in scan.called_attributes:
+        smells.add('SleepyTest')
+
+    if len(scan.local_variables) > OBSCURE_SETUP_VARIABLES:
+        smells.add('ObscureInLineSetup')
+    if class_skipped or is_skipped(method):
+        smells.add('IgnoredTest')
+    # An empty test uses nothing at all, it is reported as empty only
+    if fields and not (scan.fields & fields) and 'EmptyTest' not in smells:
+        smells.add('TestMaverick')
+    return smells
+
+def class_smells(test_class, scans, fields):
+    """Keys of the smells of a test class as a whole"""
+    smells = set()
+    if any(isinstance(node, ast.FunctionDef) and node.name == '__init__' for node in test_class.body):
+        smells.add('ConstructorInitialization')
+    if test_class.name in DEFAULT_TEST_CLASS_NAMES:
+        smells.add('DefaultTest')
+    if fields and any(not fields <= scan.fields for scan in scans):
+        smells.add('GeneralFixture')
+    if len(scans) > 1:
+        vectors = [scan.tokens for scan in scans]
+        similarities = [cosine_similarity(a, b) for a, b in combinations(vectors, 2)]
+        if sum(similarities) / len(similarities) < COHESION_THRESHOLD:
+            smells.add('LackOfCohesionOfTestCases')
+    return smells
+
+def detect_smells(data, file_name='<unknown>'):
+    """
+    Detect the smells in the content of one test file and return its rows without the location columns.
+    Unparsable content gives no rows.
+    """
+    try:
+        tree = ast.parse(data, filename=file_name)
+    except (SyntaxError, ValueError):
+        return []
+
+    # Split only where ast counts lines (\n, \r\n, \r); splitlines would also break on \x0c, \x1c-\x1e, \u2028...
+    lines = io.StringIO(data.decode('utf-8', errors='replace'), newline='').readlines()
+    line_starts = [0]
+    for line in lines:
+        line_starts.append(line_starts[-1] + len(line))
+
+    def row(smell, node):
+        # Highlight the name of the reported def or class, with its offset in characters
+        line = lines[node.lineno - 1] if node.lineno <= len(lines) else ''
+        column = line.find(node.name)
+        return {
+            'Line': node.lineno,
+            'File Name': smell,
+            'Test Smell': SMELL_NAMES[smell],
+            'Severity': SEVERITY,
+            'Description': DESCRIPTIONS[smell],
+            'Highlighted Element': node.name,
+            'Language': 'Python',
+            'Offset': line_starts[node.lineno - 1] + max(column, 0),
+            'Length': len(node.name),
+        }
+
+    rows = []
+    for test_class in iter_test_classes(tree.body):
+        scans = [
+            MethodScan(node) for node in test_class.body
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.startswith('test')
+        ]
+        fields = fixture_fields(test_class)
+        class_skipped = is_skipped(test_class)
+
+        for smell in sorted(class_smells(test_class, scans, fields)):
+            rows.append(row(smell, test_class))
+        for scan in scans:
+            for smell in sorted(method_smells(scan, fields, class_skipped)):
+                rows.append(row(smell, scan.method))
+    return rows
+
+def detect_path(file_path):
+    """
+    Worker step: read a test file and return (content hash, smell rows without location columns).
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None, []
+    return blob_sha(data), detect_smells(data, file_path)
+
+def locate(rows, relative_path, project_name):
+    """Add the location columns of a file to its smell rows"""
+    location = {'Project Name': project_name, 'Module': project_name, 'File Path': PROJECT_DIR_PREFIX + relative_path}
+    return [{**location, **row} for row in rows]
+
+def find_test_files(project_path, project_name):
+    """Detection tasks for the test files of a project, skipping VCS folders and virtualenvs"""
+    tasks = []
+    for root, files in iter_project_files(project_path):
+        for file in files:
+            if not file.endswith('.py'):
+                continue
+            file_path = os.path.join(root, file)
+            relative_path = os.path.relpath(file_path, project_path).replace(os.sep, '/')
+            if is_test_file(relative_path):
+                tasks.append((file_path, relative_path, project_name))
+    return tasks
+
+def project_rows(project_path, executor=None, cache=None):
+    """
+    Smell rows of every test file in a project, one list per file in walk order.
+    With a SmellResultCache, files whose content was analyzed before are not parsed again.
+    Returns (test files scanned, iterator over the row lists).
+    """
+    project_name = os.path.basename(os.path.normpath(project_path))
+    tasks = find_test_files(project_path, project_name)
+
+    # Cache hits are served by content hash; only the remaining files reach the detector
+    file_rows = [None] * len(tasks)
+    misses = []
+    for i, (file_path, _, _) in enumerate(tasks):
+        cached = None
+        if cache is not None:
+            try:
+                with open(file_path, 'rb') as f:
+                    cached = cache.get(blob_sha(f.read()))
+            except OSError:
+                pass
+        if cached is not None:
+            file_rows[i] = json.loads(cached)
+        else:
+            misses.append(i)
+
+    paths = [tasks[i][0] for i in misses]
+    if executor is not None:
+        detected = executor.map(detect_path, paths, chunksize=16)
+    else:
+        detected = map(detect_path, paths)
+    for i, (sha, rows) in zip(misses, detected):
+        file_rows[i] = rows
+        if cache is not None and sha is not None:
+            cache.put(sha, json.dumps(rows))
+    return len(tasks), (locate(rows, relative_path, name) for rows, (_, relative_path, name) in zip(file_rows, tasks))
+
+def detect_project(project_path, output_file, executor=None, cache=None):
+    """
+    Detect the smells of every test file in a project and write them to output_file.
+    Returns (test files scanned, smells found).
+    """
+    files, results = project_rows(project_path, executor, cache)
+    os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+    smells = 0
+
+    def write_rows(csvfile):
+        nonlocal smells
+        writer = csv.DictWriter(csvfile, fieldnames=COLUMNS)
+        writer.writeheader()
+        for rows in results:
+            writer.writerows(rows)
+            smells += len(rows)
+
+    write_atomically(output_file, write_rows)
+    return files, smells
+
+def process_projects(projects_dir, output_dir, workers=1, cache_path=None):
+    """
+    Detect smells in every project folder of projects_dir, writing <output_dir>/<project>/<project>_smells.csv.
+    cache_path names a SQLite file keeping per-file results across runs, so reruns only analyze changed files.
+    """
+    project_dirs = sorted(d for d in os.listdir(projects_dir) if os.path.isdir(os.path.join(projects_dir, d)))
+    print(f"Found {len(project_dirs)} projects to process")
+
+    total_files = 0
+    start = time.perf_counter()
+    # One pool serves every project, so workers start once
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    cache = SmellResultCache(cache_path, DETECTOR_VERSION) if cache_path else None
+    try:
+        for project in project_dirs:
+            project_start = time.perf_counter()
+            output_file = os.path.join(output_dir, project, f"{project}_smells.csv")
+            files, smells = detect_project(os.path.join(projects_dir, project), output_file, executor, cache)
+            if cache is not None:
+                cache.flush()
+            total_files += files
+            print(f"{project}: {smells} smells in {files} test files ({time.perf_counter() - project_start:.1f}s)")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if cache is not None:
+            cache.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"\nScanned {total_files} test files in {elapsed:.1f}s ({total_files / elapsed if elapsed else 0:.0f} files/s)")
+    if cache is not None:
+        print(f"Cache: {cache.hits} files unchanged, {cache.misses} analyzed")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Detect test smells in Python projects without an IDE inspection run')
+    parser.add_argument('--projects_dir', default="/home/iit/Downloads/Thesis/Smells_Dataset",
+                        help='Folder holding one folder per project')
+    parser.add_argument('--output_dir', default=".../TEST_SMELL_EXTRACT_CSV",
+                        help='Folder receiving one CSV per project')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processes scanning files in parallel, 1 scans sequentially')
+    parser.add_argument('--cache', help='SQLite file keeping per-file results, so reruns only analyze changed files')
+    args = parser.parse_args()
+
+    process_projects(args.projects_dir, args.output_dir, args.workers, args.cache)
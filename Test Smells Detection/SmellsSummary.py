@@ -1,8 +1,15 @@
-
-
+import argparse
+import numpy as np
 import pandas as pd
 import os
 
+from UpdateSmellFormate18 import SMELL_MAPPING
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # Only needed for aggregated Parquet files
+    pq = None
+
 def clean_file_path(path):
     """Remove the repetitive prefix from file paths"""
     prefix = "file://$PROJECT_DIR$/"
@@ -10,44 +17,140 @@ def clean_file_path(path):
         return path[len(prefix):]
     return path
 
-def generate_smell_summary(input_csv, output_dir):
-    # Read the CSV file
-    df = pd.read_csv(input_csv)
+def read_columns(input_file):
+    """Column names of an aggregated CSV or Parquet file, without reading its rows"""
+    if isinstance(input_file, pd.DataFrame):
+        return list(input_file.columns)
+    if input_file.endswith('.parquet'):
+        return pq.read_schema(input_file).names
+    return list(pd.read_csv(input_file, nrows=0).columns)
+
+def load_smell_codes(input_csv):
+    """
+    Read the file path and smell name columns of an aggregated file, or of a DataFrame already in memory, as categoricals.
+    Returns (path column name, cleaned unique paths, path code per row, unique smell names, smell code per row);
+    rows missing either value are dropped.
+    """
+    columns = read_columns(input_csv)
+    file_path_col = [col for col in columns if 'path' in col.lower() or 'file' in col.lower()][0]
+    smell_name_col = [col for col in columns if 'smell' in col.lower()][0]
     
-    # Identify columns
-    file_path_col = [col for col in df.columns if 'path' in col.lower() or 'file' in col.lower()][0]
-    smell_name_col = [col for col in df.columns if 'smell' in col.lower()][0]
+    # Read only the two columns the summary needs
+    if isinstance(input_csv, pd.DataFrame):
+        df = input_csv[[file_path_col, smell_name_col]]
+    elif input_csv.endswith('.parquet'):
+        df = pd.read_parquet(input_csv, columns=[file_path_col, smell_name_col])
+    else:
+        df = pd.read_csv(input_csv, usecols=[file_path_col, smell_name_col],
+                         dtype={file_path_col: 'category', smell_name_col: 'category'})
+    paths = df[file_path_col].astype('category')
+    smells = df[smell_name_col].astype('category')
     
-    # Clean file paths
-    df[file_path_col] = df[file_path_col].apply(clean_file_path)
+    # Paths are cleaned once per distinct value; paths that only differed by the prefix share a code afterwards
+    path_remap, cleaned_paths = pd.factorize(paths.cat.categories.map(clean_file_path))
+    keep = (paths.cat.codes.to_numpy() >= 0) & (smells.cat.codes.to_numpy() >= 0)
+    # Files left without any row after dropping missing values get no summary line, as with groupby
+    used_paths, path_codes = np.unique(path_remap[paths.cat.codes.to_numpy()[keep]], return_inverse=True)
+    smell_codes = smells.cat.codes.to_numpy()[keep].astype(np.int64)
+    return file_path_col, pd.Index(cleaned_paths[used_paths]), path_codes, smells.cat.categories, smell_codes
+
+def build_smell_matrix(sources):
+    """
+    Count every smell of every file across all sources in one vectorized crosstab.
+    
+    sources lists (project, aggregated file or DataFrame) pairs. Returns (files, smell_names, counts, path_columns):
+    files has one row per distinct (source, cleaned path) with its 'Source' position and 'Path' text,
+    smell_names holds the distinct smell names of the corpus, counts is the files x smell_names count
+    matrix and path_columns the file path column name of each source.
+    """
+    path_columns = []
+    file_blocks = []
+    file_codes = []
+    smell_codes = []
+    smell_ids = {}
+    offset = 0
+    
+    for position, (_, input_csv) in enumerate(sources):
+        file_path_col, paths, path_codes, smells, codes = load_smell_codes(input_csv)
+        path_columns.append(file_path_col)
+        # Smell codes of each file are translated to corpus-wide ids
+        remap = np.array([smell_ids.setdefault(smell, len(smell_ids)) for smell in smells], dtype=np.int64)
+        file_codes.append(path_codes + offset)
+        smell_codes.append(remap[codes] if len(remap) else codes)
+        file_blocks.append(pd.DataFrame({'Source': position, 'Path': paths}))
+        offset += len(paths)
     
-    # Group by unique file path and smell name, and count occurrences
-    smell_summary = df.groupby([file_path_col, smell_name_col]).size().reset_index(name='smell_count')
+    smell_names = list(smell_ids)
+    files = pd.concat(file_blocks, ignore_index=True) if file_blocks else pd.DataFrame(columns=['Source', 'Path'])
+    if not smell_names:
+        return files, smell_names, np.zeros((offset, 0), dtype=np.int64), path_columns
+    cells = np.concatenate(file_codes) * len(smell_names) + np.concatenate(smell_codes)
+    counts = np.bincount(cells, minlength=offset * len(smell_names)).reshape(offset, len(smell_names))
+    return files, smell_names, counts, path_columns
+
+def standardization_matrix(smell_names, present):
+    """
+    0/1 matrix sending smell names to their standard smell column. Like UpdateSmellFormate18, only the
+    first variation present in the project (a column of its summary) is used, the others are not added.
+    """
+    matrix = np.zeros((len(smell_names), len(SMELL_MAPPING)), dtype=np.int64)
+    index = {name: i for i, name in enumerate(smell_names) if present[i]}
+    for column, variations in enumerate(SMELL_MAPPING.values()):
+        for variation in variations:
+            if variation in index:
+                matrix[index[variation], column] = 1
+                break
+    return matrix
+
+def summarize_corpus(sources):
+    """
+    Summarize every source's smells from a single corpus-wide count matrix.
     
-    # Pivot the table 
-    pivot_summary = smell_summary.pivot_table(
-        index=file_path_col, 
-        columns=smell_name_col, 
-        values='smell_count', 
-        fill_value=0
-    ).reset_index()
+    Yields (project, input file, summary, standardized) per source: summary has the per-file counts of
+    each smell name present, as the old pivot table did, and standardized the 18 columns of
+    UpdateSmellFormate18, taken from the same matrix instead of re-reading the summary.
+    """
+    files, smell_names, counts, path_columns = build_smell_matrix(sources)
+    sort_names = np.argsort(np.array(smell_names, dtype=object), kind='stable')
     
-    # Sort rows by total smells
-    pivot_summary['total_smells'] = pivot_summary.iloc[:, 1:].sum(axis=1)
-    pivot_summary = pivot_summary.sort_values('total_smells', ascending=False)
+    # Files are stored source by source, so each source is one contiguous block of rows
+    bounds = np.searchsorted(files['Source'].to_numpy(), np.arange(len(sources) + 1))
+    for position, (project, input_csv) in enumerate(sources):
+        rows = slice(bounds[position], bounds[position + 1])
+        paths = files['Path'].iloc[rows].to_numpy()
+        project_counts = counts[rows]
+        
+        # Like the pivot table: files sorted by path, then by total smells; only smells present as columns
+        order = np.argsort(paths.astype(str), kind='stable')
+        totals = project_counts.sum(axis=1)
+        order = order[np.argsort(-totals[order], kind='stable')]
+        present = [i for i in sort_names if project_counts[:, i].any()]
+        
+        summary = pd.DataFrame(project_counts[order][:, present], columns=[smell_names[i] for i in present])
+        summary.insert(0, path_columns[position], paths[order])
+        summary['total_smells'] = totals[order]
+        
+        standard_counts = project_counts @ standardization_matrix(smell_names, project_counts.any(axis=0))
+        standardized = pd.DataFrame(standard_counts[order], columns=list(SMELL_MAPPING))
+        standardized.insert(0, 'File Path', paths[order])
+        standardized['Total Smells'] = standardized[list(SMELL_MAPPING)].sum(axis=1)
+        yield project, input_csv, summary, standardized
+
+def generate_smell_summary(input_csv, output_dir):
+    """Per-file smell counts of one aggregated file, written to output_dir/smell_summary.csv"""
+    project = os.path.basename(os.path.dirname(input_csv))
+    _, _, pivot_summary, _ = next(summarize_corpus([(project, input_csv)]))
     
     # Save to CSV
     os.makedirs(output_dir, exist_ok=True)
-    output_path = os.path.join(output_dir, 'smell_summary.csv')
-    pivot_summary.to_csv(output_path, index=False)
+    pivot_summary.to_csv(os.path.join(output_dir, 'smell_summary.csv'), index=False)
     
     print(f"Summary for {input_csv}: {len(pivot_summary)} unique file paths")
     return pivot_summary
 
-def process_all_projects(base_dir):
-    print("Processing all projects in:", base_dir)
-    print("-" * 50)
-    
+def find_sources(base_dir):
+    """(project, aggregated file) pairs of every project folder in base_dir"""
+    sources = []
     for project_folder in os.listdir(base_dir):
         project_path = os.path.join(base_dir, project_folder)
         
@@ -56,21 +159,39 @@ def process_all_projects(base_dir):
             continue
         
         # Find CSV files
-        csv_files = [f for f in os.listdir(project_path) if f.endswith('_aggregated.csv')]
+        csv_files = [f for f in os.listdir(project_path) if f.endswith(('_aggregated.csv', '_aggregated.parquet'))]
         
         if csv_files:
-            print(f"\nProcessing project: {project_folder}")
-            
             for csv_file in csv_files:
-                input_csv = os.path.join(project_path, csv_file)
-                output_dir = os.path.join(project_path, 'Summary')
-                
-                generate_smell_summary(input_csv, output_dir)
+                sources.append((project_folder, os.path.join(project_path, csv_file)))
         else:
             print(f"\nNo aggregated CSV files found in: {project_folder}")
+    return sources
 
-# Base directory
-base_dir = '.../TestSmells/SmellsCleanAggregatedData'
+def process_all_projects(base_dir, standardized_dir=None):
+    """
+    Write Summary/smell_summary.csv for every project, and with standardized_dir
+    the <project>_standardized.csv files UpdateSmellFormate18 would produce from them.
+    """
+    print("Processing all projects in:", base_dir)
+    print("-" * 50)
+    
+    for project, input_csv, summary, standardized in summarize_corpus(find_sources(base_dir)):
+        output_dir = os.path.join(os.path.dirname(input_csv), 'Summary')
+        os.makedirs(output_dir, exist_ok=True)
+        summary.to_csv(os.path.join(output_dir, 'smell_summary.csv'), index=False)
+        print(f"Summary for {input_csv}: {len(summary)} unique file paths")
+        
+        if standardized_dir:
+            os.makedirs(standardized_dir, exist_ok=True)
+            standardized.to_csv(os.path.join(standardized_dir, f"{project}_standardized.csv"), index=False)
 
-# Process all projects
-process_all_projects(base_dir)
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Count test smells per file for every project in one pass')
+    parser.add_argument('--base_dir', default='.../TestSmells/SmellsCleanAggregatedData',
+                        help='Folder holding one folder per project with its aggregated smells')
+    parser.add_argument('--standardized_dir',
+                        help='Also write the 18-column standardized counts per project here, as UpdateSmellFormate18 does')
+    args = parser.parse_args()
+    
+    process_all_projects(args.base_dir, args.standardized_dir)
\ No newline at end of file
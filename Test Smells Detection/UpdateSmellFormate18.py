@@ -1,29 +1,29 @@
 import pandas as pd
 import os
 
-def standardize_smell_data(input_path, output_dir):
-    # Define exact mapping between input column names and standard names
-    smell_mapping = {
-        'Assertion Roulette': ['Assertion Roulette'],
-        'Conditional Test Logic': ['logic test', 'Conditional logic test'],
-        'Constructor Initialization': [],
-        'Default Test': [],
-        'Duplicate Assertion': ['Duplicate assertion test'],
-        'Empty Test': [],
-        'Exception Handling': ['Exception handling test'],
-        'General Fixture': [],
-        'Ignored Test': [],
-        'Lack of Cohesion of Test Cases': [],
-        'Magic Number Test': ['Magic number test'],
-        'Obscure In-Line Setup': ['Obscure in line setup test'],
-        'Redundant Assertion': ['Redundant assertion test'],
-        'Redundant Print': ['Redundant print test'],
-        'Sleepy Test': ['Sleepy test'],
-        'Suboptimal Assert': [],
-        'Test Maverick': [],
-        'Unknown Test': []
-    }
+# Exact mapping between the smell names found in summaries and the 18 standard names
+SMELL_MAPPING = {
+    'Assertion Roulette': ['Assertion Roulette'],
+    'Conditional Test Logic': ['logic test', 'Conditional logic test'],
+    'Constructor Initialization': ['Constructor Initialization'],
+    'Default Test': ['Default Test'],
+    'Duplicate Assertion': ['Duplicate assertion test'],
+    'Empty Test': ['Empty Test'],
+    'Exception Handling': ['Exception handling test'],
+    'General Fixture': ['General Fixture'],
+    'Ignored Test': ['Ignored Test'],
+    'Lack of Cohesion of Test Cases': ['Lack of Cohesion of Test Cases'],
+    'Magic Number Test': ['Magic number test'],
+    'Obscure In-Line Setup': ['Obscure in line setup test'],
+    'Redundant Assertion': ['Redundant assertion test'],
+    'Redundant Print': ['Redundant print test'],
+    'Sleepy Test': ['Sleepy test'],
+    'Suboptimal Assert': ['Suboptimal Assert'],
+    'Test Maverick': ['Test Maverick'],
+    'Unknown Test': ['Unknown Test']
+}
 
+def standardize_smell_data(input_path, output_dir):
     # Process each project folder
     for project_folder in os.listdir(input_path):
         summary_path = os.path.join(input_path, project_folder, 'Summary')
@@ -46,7 +46,7 @@ def standardize_smell_data(input_path, output_dir):
             new_df['File Path'] = df[file_path_col]
             
             # Map the columns using exact mapping
-            for std_smell, input_variations in smell_mapping.items():
+            for std_smell, input_variations in SMELL_MAPPING.items():
                 found = False
                 for variation in input_variations:
                     if variation in df.columns:
@@ -57,7 +57,7 @@ def standardize_smell_data(input_path, output_dir):
                     new_df[std_smell] = 0
             
             # Calculate total smells from the mapped columns
-            smell_columns = list(smell_mapping.keys())
+            smell_columns = list(SMELL_MAPPING.keys())
             new_df['Total Smells'] = new_df[smell_columns].sum(axis=1)
             
             # Create output directory
@@ -72,11 +72,12 @@ def standardize_smell_data(input_path, output_dir):
             print("First row values:")
             print(new_df.iloc[0])
 
-# Paths
-input_path = '.../SmellsCleanAggregatedData/'
-output_dir = '.../TestSmells/18SmellsCleanData'
+if __name__ == "__main__":
+    # Paths
+    input_path = '.../SmellsCleanAggregatedData/'
+    output_dir = '.../TestSmells/18SmellsCleanData'
 
-# Process all projects
-print("Starting standardization process...")
-standardize_smell_data(input_path, output_dir)
-print("\nStandardization complete!")
\ No newline at end of file
+    # Process all projects
+    print("Starting standardization process...")
+    standardize_smell_data(input_path, output_dir)
+    print("\nStandardization complete!")
\ No newline at end of file
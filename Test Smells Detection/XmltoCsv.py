@@ -1,11 +1,52 @@
-
-
-import xml.etree.ElementTree as ET
 import csv
 import os
-import glob
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from ProblemParser import ProblemField, ProblemParser, iter_problems
+from ExtractSmellyFiles import read_manifest
+from SmellCache import SmellResultCache, file_sha, source_version
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional, CSV needs nothing beyond the standard library
+    pa = pq = None
+
+# Columns of a converted report, in output order; missing tags leave the value empty
+REPORT_PARSER = ProblemParser([
+    ProblemField('file', 'file', remove='file://$PROJECT_DIR$/'),
+    ProblemField('line', 'line'),
+    ProblemField('module', 'module'),
+    ProblemField('problem_class_id', 'problem_class', attribute='id'),
+    ProblemField('severity', 'problem_class', attribute='severity'),
+    ProblemField('description', 'description'),
+    ProblemField('highlighted_element', 'highlighted_element'),
+    ProblemField('language', 'language'),
+    ProblemField('offset', 'offset'),
+    ProblemField('length', 'length'),
+])
+HEADERS = REPORT_PARSER.columns
+
+# Problems buffered per Parquet row group
+PARQUET_BATCH_ROWS = 65536
+
+def write_atomically(output_file, write_rows, binary=False):
+    """
+    Run write_rows on a temporary file next to output_file and move it into place on success,
+    so a report that fails half way through leaves no partial output behind.
+    """
+    temp_file = f"{output_file}.tmp"
+    try:
+        with (open(temp_file, 'wb') if binary else open(temp_file, 'w', newline='', encoding='utf-8')) as outfile:
+            write_rows(outfile)
+        os.replace(temp_file, output_file)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
 def convert_xml_to_csv(input_file, output_file):
     """
     Convert a single XML file containing test smell data to CSV format.
@@ -15,51 +56,137 @@ def convert_xml_to_csv(input_file, output_file):
         output_file (str): Path for output CSV file
     """
     try:
-        # Parse XML file
-        tree = ET.parse(input_file)
-        root = tree.getroot()
-        
-        # Define CSV headers
-        headers = ['file', 'line', 'module', 'problem_class_id', 'severity', 
-                  'description', 'highlighted_element', 'language', 'offset', 'length']
-        
         # Create output directory if it doesn't exist
         os.makedirs(os.path.dirname(output_file), exist_ok=True)
         
-        # Open CSV file for writing
-        with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=headers)
+        def write_rows(csvfile):
+            writer = csv.DictWriter(csvfile, fieldnames=HEADERS)
             writer.writeheader()
             
-            # Process each problem in the XML
-            for problem in root.findall('.//problem'):
-                row = {
-                    'file': problem.find('file').text.replace('file://$PROJECT_DIR$/', ''),
-                    'line': problem.find('line').text,
-                    'module': problem.find('module').text,
-                    'problem_class_id': problem.find('problem_class').get('id'),
-                    'severity': problem.find('problem_class').get('severity'),
-                    'description': problem.find('description').text,
-                    'highlighted_element': problem.find('highlighted_element').text,
-                    'language': problem.find('language').text,
-                    'offset': problem.find('offset').text,
-                    'length': problem.find('length').text
-                }
-                writer.writerow(row)
+            # Stream the problems out of the XML one at a time
+            for problem in iter_problems(input_file):
+                writer.writerow(REPORT_PARSER.parse(problem))
         
+        write_atomically(output_file, write_rows)
+        return True, None
+    except Exception as e:
+        return False, str(e)
+
+def parquet_schema():
+    """
+    Typed layout of a converted report: positions are integers, and the few distinct
+    module, smell, severity and language names are dictionary-encoded.
+    """
+    category = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('file', pa.string()),
+        ('line', pa.int32()),
+        ('module', category),
+        ('problem_class_id', category),
+        ('severity', category),
+        ('description', pa.string()),
+        ('highlighted_element', pa.string()),
+        ('language', category),
+        ('offset', pa.int64()),
+        ('length', pa.int32()),
+    ])
+
+def integer_values(row, columns):
+    """Parse the integer columns of a parsed problem in place; missing tags stay nulls"""
+    for name in columns:
+        if row[name] is not None:
+            row[name] = int(row[name])
+    return row
+
+def write_parquet(output_file, schema, rows):
+    """
+    Write rows, dicts of values already of the schema's types, to a Parquet file in row groups;
+    a write that fails half way through leaves no partial file behind.
+    """
+    def write_rows(parquetfile):
+        with pq.ParquetWriter(parquetfile, schema) as writer:
+            columns = {name: [] for name in schema.names}
+            buffered = 0
+            
+            def flush():
+                writer.write_batch(pa.RecordBatch.from_pydict(columns, schema=schema))
+                for values in columns.values():
+                    values.clear()
+            
+            # Problems are buffered into row groups, so memory stays bounded like the CSV path
+            for row in rows:
+                for name, values in columns.items():
+                    values.append(row.get(name))
+                buffered += 1
+                if buffered >= PARQUET_BATCH_ROWS:
+                    flush()
+                    buffered = 0
+            flush()
+    
+    write_atomically(output_file, write_rows, binary=True)
+
+def convert_xml_to_parquet(input_file, output_file):
+    """
+    Convert a single XML file containing test smell data to a typed Parquet file.
+    
+    Args:
+        input_file (str): Path to input XML file
+        output_file (str): Path for output Parquet file
+    """
+    try:
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        rows = (
+            integer_values(REPORT_PARSER.parse(problem), ('line', 'offset', 'length'))
+            for problem in iter_problems(input_file)
+        )
+        write_parquet(output_file, parquet_schema(), rows)
         return True, None
     except Exception as e:
         return False, str(e)
 
-def process_folder_structure(base_input_dir, base_output_dir):
+# Converter and file extension of each output format
+CONVERTERS = {
+    'csv': (convert_xml_to_csv, '.csv'),
+    'parquet': (convert_xml_to_parquet, '.parquet'),
+}
+
+# Cached conversions from any other revision of the converter are ignored
+CONVERTER_VERSION = source_version(os.path.abspath(__file__), os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ProblemParser.py'))
+
+def is_unchanged(cache, output_format, input_file, output_file):
+    """
+    Whether output_file still holds what converting this exact report content produced last time.
+    Returns (unchanged, cache key of the report).
+    """
+    key = f"{output_format}:{file_sha(input_file)}"
+    cached = cache.get(key)
+    return cached is not None and os.path.exists(output_file) and file_sha(output_file) == cached, key
+
+def report_size(path):
+    """Size of a report for scheduling; a missing report sorts last and fails in its own conversion"""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+def process_folder_structure(base_input_dir, base_output_dir, workers=1, output_format='csv', cache_path=None):
     """
     Process all folders and XML files in the input directory structure and create
-    corresponding CSV files in the output directory structure.
+    corresponding CSV or Parquet files in the output directory structure.
     
     Args:
         base_input_dir (str): Base directory containing folders with XML files
-        base_output_dir (str): Base directory for output CSV folder structure
+        base_output_dir (str): Base directory for output folder structure
+        workers (int): Processes converting reports in parallel, 1 converts in this process
+        output_format (str): 'csv', or 'parquet' for typed columnar files (needs pyarrow)
+        cache_path (str): SQLite file remembering converted report contents, so reports unchanged
+            since the last run are skipped
     """
+    convert, extension = CONVERTERS[output_format]
+    if output_format == 'parquet' and pq is None:
+        print("Parquet output needs pyarrow, install it or use the csv format")
+        return
+    
     # Convert paths to Path objects
     base_input_path = Path(base_input_dir)
     base_output_path = Path(base_output_dir)
@@ -68,50 +195,112 @@ def process_folder_structure(base_input_dir, base_output_dir):
     os.makedirs(base_output_path, exist_ok=True)
     
     # Keep track of statistics
-    total_files = 0
     successful_conversions = 0
     failed_conversions = 0
+    unchanged_conversions = 0
     processed_folders = 0
     
     print(f"Starting conversion process...")
     print(f"Input directory: {base_input_path}")
     print(f"Output directory: {base_output_path}")
     
-    # Walk through all subdirectories
+    # Walk through all subdirectories and collect the reports, every one converts independently
+    jobs = []
     for folder_path, _, files in os.walk(base_input_path):
-        xml_files = [f for f in files if f.endswith('.xml')]
+        # Reports stored in the folder, plus those its smell manifest points to
+        xml_sources = {f: Path(folder_path) / f for f in files if f.endswith('.xml')}
+        for xml_file, source in read_manifest(folder_path).items():
+            if xml_file.endswith('.xml'):
+                xml_sources.setdefault(xml_file, Path(source))
         
-        if xml_files:
+        if xml_sources:
             processed_folders += 1
             relative_path = Path(folder_path).relative_to(base_input_path)
             output_folder = base_output_path / relative_path
             
-            print(f"\nProcessing folder: {relative_path}")
+            for xml_file, input_file in xml_sources.items():
+                output_file = output_folder / f"{xml_file[:-4]}{extension}"
+                jobs.append((relative_path, xml_file, input_file, output_file))
+    
+    total_files = len(jobs)
+    start = time.perf_counter()
+    
+    # Reports whose content was converted before and whose output is intact need no conversion
+    cache = SmellResultCache(cache_path, CONVERTER_VERSION) if cache_path else None
+    cache_keys = {}
+    unchanged = set()
+    if cache is not None:
+        for job in jobs:
+            try:
+                is_same, cache_keys[job[2]] = is_unchanged(cache, output_format, job[2], job[3])
+            except OSError:
+                # A stale manifest entry is left to its conversion, which counts it as failed
+                continue
+            if is_same:
+                unchanged.add(job[2])
+    pending = [job for job in jobs if job[2] not in unchanged]
+    
+    if workers > 1:
+        print(f"Converting {len(pending)} files on {workers} processes")
+        executor = ProcessPoolExecutor(max_workers=workers)
+        # Largest reports are submitted first so one big project does not finish alone at the end
+        futures = {}
+        for job in sorted(pending, key=lambda job: report_size(job[2]), reverse=True):
+            futures[job[2]] = executor.submit(convert, job[2], job[3])
+        results = (None if job[2] in unchanged else futures[job[2]].result() for job in jobs)
+    else:
+        executor = None
+        results = (None if job[2] in unchanged else convert(job[2], job[3]) for job in jobs)
+    
+    # Results are reported folder by folder, in walk order
+    current_folder = None
+    try:
+        for (relative_path, xml_file, input_file, output_file), result in zip(jobs, results):
+            if relative_path != current_folder:
+                current_folder = relative_path
+                print(f"\nProcessing folder: {relative_path}")
+            
+            if result is None:
+                unchanged_conversions += 1
+                print(f"Unchanged: {xml_file}")
+                continue
             
-            # Process each XML file in the current folder
-            for xml_file in xml_files:
-                total_files += 1
-                input_file = Path(folder_path) / xml_file
-                output_file = output_folder / f"{xml_file[:-4]}.csv"
-                
-                print(f"Converting: {xml_file}")
-                success, error = convert_xml_to_csv(input_file, output_file)
-                
-                if success:
-                    successful_conversions += 1
-                else:
-                    failed_conversions += 1
-                    print(f"Error converting {xml_file}: {error}")
+            success, error = result
+            if success:
+                successful_conversions += 1
+                print(f"Converted: {xml_file}")
+                if cache is not None and input_file in cache_keys:
+                    cache.put(cache_keys[input_file], file_sha(output_file))
+            else:
+                failed_conversions += 1
+                print(f"Error converting {xml_file}: {error}")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if cache is not None:
+            cache.close()
+    
+    elapsed = time.perf_counter() - start
     
     # Print summary
     print("\nConversion Summary:")
     print(f"Processed folders: {processed_folders}")
     print(f"Total files processed: {total_files}")
     print(f"Successful conversions: {successful_conversions}")
+    if cache is not None:
+        print(f"Unchanged since last run: {unchanged_conversions}")
     print(f"Failed conversions: {failed_conversions}")
+    print(f"Conversion time: {elapsed:.1f}s ({total_files / elapsed if elapsed else 0:.1f} files/s)")
 
 if __name__ == "__main__":
-    input_dir = ".../TEST_SMELL_EXTRACT"
-    output_dir = ".../TEST_SMELL_EXTRACT_CSV"
+    parser = argparse.ArgumentParser(description='Convert inspection XML reports to CSV, keeping the folder layout')
+    parser.add_argument('--input_dir', default=".../TEST_SMELL_EXTRACT", help='Folder tree holding the XML reports')
+    parser.add_argument('--output_dir', default=".../TEST_SMELL_EXTRACT_CSV", help='Folder tree for the CSV files')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processes converting reports in parallel, 1 converts sequentially')
+    parser.add_argument('--format', choices=sorted(CONVERTERS), default='csv',
+                        help='Output format, parquet writes typed columnar files')
+    parser.add_argument('--cache', help='SQLite file remembering converted reports, so unchanged ones are skipped')
+    args = parser.parse_args()
     
-    process_folder_structure(input_dir, output_dir)
\ No newline at end of file
+    process_folder_structure(args.input_dir, args.output_dir, args.workers, args.format, args.cache)
@@ -0,0 +1,92 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from ProblemParser import iter_problems
+from Single_XmltoCSV import PROJECT_PARSER
+
+# Compare the single-pass ProblemParser against one problem.find per field on a synthetic report
+SMELLS = ['Assertion Roulette', 'Conditional logic test', 'Duplicate assertion test', 'Magic number test',
+          'Redundant print test', 'Sleepy test', 'Exception handling test', 'Obscure in line setup test']
+
+def write_synthetic_report(path, problems):
+    """
+    Write an inspection report shaped like the PyNose/PyCharm export with the given number of problems.
+    """
+    random.seed(0)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<problems is_local_tool="true">\n')
+        for i in range(problems):
+            test_file = f"file://$PROJECT_DIR$/tests/test_module_{i % 4999}.py"
+            f.write(
+                f'<problem>\n'
+                f'  <file>{test_file}</file>\n'
+                f'  <line>{random.randint(1, 2000)}</line>\n'
+                f'  <module>project</module>\n'
+                f'  <entry_point TYPE="file" FQNAME="{test_file}" />\n'
+                f'  <problem_class id="PyNose" severity="WEAK WARNING" attribute_key="INFO_ATTRIBUTES">'
+                f'{random.choice(SMELLS)}</problem_class>\n'
+                f'  <description>Test smell found in test_case_{i}</description>\n'
+                f'  <highlighted_element>test_case_{i}</highlighted_element>\n'
+                f'  <language>Python</language>\n'
+                f'  <offset>{random.randint(0, 100000)}</offset>\n'
+                f'  <length>{random.randint(1, 200)}</length>\n'
+                f'</problem>\n'
+            )
+        f.write('</problems>\n')
+
+def parse_with_find(problem):
+    """
+    The previous per-field extraction of Single_XmltoCSV: two or three subtree searches per column.
+    """
+    return {
+        'Module': problem.find('module').text if problem.find('module') is not None else 'N/A',
+        'File Path': problem.find('file').text if problem.find('file') is not None else 'N/A',
+        'Line': problem.find('line').text if problem.find('line') is not None else 'N/A',
+        'File Name': problem.find('problem_class').get('id', 'N/A') if problem.find('problem_class') is not None else 'N/A',
+        'Test Smell': problem.find('problem_class').text if problem.find('problem_class') is not None else 'N/A',
+        'Severity': problem.find('problem_class').get('severity', 'N/A') if problem.find('problem_class') is not None else 'N/A',
+        'Description': problem.find('description').text if problem.find('description') is not None else 'N/A',
+        'Highlighted Element': problem.find('highlighted_element').text if problem.find('highlighted_element') is not None else 'N/A',
+        'Language': problem.find('language').text if problem.find('language') is not None else 'N/A',
+        'Offset': problem.find('offset').text if problem.find('offset') is not None else 'N/A',
+        'Length': problem.find('length').text if problem.find('length') is not None else 'N/A'
+    }
+
+def time_parser(report_path, parse):
+    """
+    Stream the report through parse and return (seconds, rows checksum).
+    """
+    start = time.perf_counter()
+    checksum = 0
+    for problem in iter_problems(report_path):
+        checksum = hash((checksum, tuple(parse(problem).values())))
+    return time.perf_counter() - start, checksum
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the schema-driven problem parser against per-field find calls')
+    parser.add_argument('--problems', type=int, default=1_000_000, help='Problems in the synthetic report')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        report_path = os.path.join(temp_dir, 'synthetic.xml')
+        write_synthetic_report(report_path, args.problems)
+        print(f"Synthetic report: {args.problems} problems, {os.path.getsize(report_path) / 1e6:.0f} MB")
+
+        # Streaming alone sets the floor both extractors share
+        stream_time, _ = time_parser(report_path, lambda problem: {})
+        find_time, find_checksum = time_parser(report_path, parse_with_find)
+        schema_time, schema_checksum = time_parser(report_path, PROJECT_PARSER.parse)
+
+    print(f"{'iterparse only:':<22}{stream_time:.2f}s")
+    for label, elapsed in (('per-field find:', find_time), ('ProblemParser:', schema_time)):
+        extraction = elapsed - stream_time
+        print(f"{label:<22}{elapsed:.2f}s  ({args.problems / elapsed:,.0f} problems/s, "
+              f"extraction {extraction:.2f}s)")
+    print(f"Extraction speedup: {(find_time - stream_time) / max(schema_time - stream_time, 1e-9):.1f}x, "
+          f"identical rows: {find_checksum == schema_checksum}")
+
+if __name__ == "__main__":
+    main()